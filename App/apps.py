@@ -1,5 +1,19 @@
 from django.apps import AppConfig
+from django.contrib.staticfiles.apps import (
+    StaticFilesConfig as BaseStaticFilesConfig
+)
 
 
 class AppConfig(AppConfig):
     name = 'App'
+
+    def ready(self) -> None:
+        from App import db  # noqa
+
+
+class StaticFilesConfig(BaseStaticFilesConfig):
+    '''Leave the sources of the assets (Sass, Less, SVG sprites, npm and
+    gulp files) out of collectstatic'''
+    ignore_patterns = BaseStaticFilesConfig.ignore_patterns + [
+        'scss', 'less', 'sprites', 'svgs', 'package*.json', 'gulpfile.js',
+    ]
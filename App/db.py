@@ -0,0 +1,31 @@
+'''Tuning of the SQLite connections (settings.SQLITE_PRAGMAS), applied
+to each new connection of the SQLite databases'''
+from typing import Any, Dict, List, Union
+import re
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+PRAGMA_VALUE: Any = re.compile(r'^-?\w+$')
+
+
+def pragma_statements(pragmas: Dict[str, Union[int, str]]) -> List[str]:
+    '''PRAGMA statements setting the pragmas (names and values can't be
+    bound as parameters, hence checked)'''
+    statements: List[str] = []
+    for name, value in pragmas.items():
+        if not name.isidentifier() or not PRAGMA_VALUE.match(str(value)):
+            raise ValueError(f'Invalid SQLite pragma: {name}={value}')
+        statements.append(f'PRAGMA {name} = {value}')
+    return statements
+
+
+@receiver(connection_created)
+def configure_sqlite(sender: Any, connection: Any, **kwargs: Any) -> None:
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for statement in pragma_statements(
+            getattr(settings, 'SQLITE_PRAGMAS', {})
+        ):
+            cursor.execute(statement)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+import os
+import re
+import resource
+import subprocess
+import sys
+import time
+from django.conf import settings
+from django.core.management.base import (BaseCommand, CommandError,
+                                         CommandParser)
+
+IMPORT_TIME: Any = re.compile(
+    r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(.+)$'
+)
+
+
+def parse_import_times(output: str) -> List[Tuple[str, int, int, int]]:
+    '''(module, self, cumulative import time in us, nesting level) of the
+    modules listed by python -X importtime'''
+    modules: List[Tuple[str, int, int, int]] = []
+    for line in output.splitlines():
+        match: Any = IMPORT_TIME.match(line)
+        if match is not None:
+            self_us, cumulative_us, indent, module = match.groups()
+            modules.append((module, int(self_us), int(cumulative_us),
+                            len(indent) // 2))
+    return modules
+
+
+class Command(BaseCommand):
+    help: str = ('Reports the import time of the modules loaded at the start '
+                 'of a web worker (w/ the current settings, see --settings)')
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--top', type=int, default=25,
+                            help='Number of modules (or packages) listed')
+        parser.add_argument('--sort', choices=('self', 'cumulative'),
+                            default='cumulative',
+                            help='Import time by which the modules are sorted')
+        parser.add_argument('--by-package', action='store_true',
+                            help='Sum the import times by top-level package')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        '''Import the WSGI module in a fresh interpreter w/ -X importtime'''
+        wsgi_module: str = settings.WSGI_APPLICATION.rsplit('.', 1)[0]
+        start: float = time.perf_counter()
+        process: subprocess.CompletedProcess = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c',
+             f'import {wsgi_module}'],
+            env=dict(os.environ), cwd=settings.BASE_DIR,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            universal_newlines=True
+        )
+        wall: float = time.perf_counter() - start
+        if process.returncode:  # The last error line, if any (not if killed)
+            errors: List[str] = [line for line in process.stderr.splitlines()
+                                 if not IMPORT_TIME.match(line)]
+            detail: str = f': {errors[-1]}' if errors else ''
+            raise CommandError(f'The import of {wsgi_module} failed (return '
+                               f'code {process.returncode}){detail}')
+        modules: List[Tuple[str, int, int, int]] = parse_import_times(
+            process.stderr
+        )
+        if options['by_package']:
+            packages: Dict[str, int] = defaultdict(int)
+            for module, self_us, __, __ in modules:
+                packages[module.split('.')[0]] += self_us
+            rows: List[Tuple[str, int]] = sorted(
+                packages.items(), key=lambda row: row[1], reverse=True
+            )
+        else:
+            column: int = 1 if options['sort'] == 'self' else 2
+            rows = [(f'{"  " * level}{module}', row[column])
+                    for row in sorted(modules, key=lambda row: row[column],
+                                      reverse=True)
+                    for module, __, __, level in (row,)]
+        print(f'{"module" if not options["by_package"] else "package":<60}'
+              f'{"ms":>10}')
+        for name, us in rows[:options['top']]:
+            print(f'{name[:59]:<60}{us / 1000:>10.1f}')
+        max_rss: int = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        print(f'\n{len(modules)} modules imported in '
+              f'{sum(row[1] for row in modules) / 1000:.0f} ms '
+              f'(worker start: {wall * 1000:.0f} ms, '
+              f'max RSS: {max_rss / 1024:.1f} MiB)')
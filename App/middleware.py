@@ -0,0 +1,29 @@
+from typing import Callable
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from App.routers import pin_to_primary, sticky, unpin, wrote_to_primary
+
+
+class ReplicaStickinessMiddleware:
+    '''Read from the primary database during the requests of the clients
+    which wrote to it in the last settings.REPLICA_STICKY_SECONDS (a
+    cookie marks them), so that they read their own writes'''
+    COOKIE: str = 'pin_primary'
+
+    def __init__(self,
+                 get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response: Callable[[HttpRequest], HttpResponse] = \
+            get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        unpin()
+        if request.COOKIES.get(self.COOKIE):
+            pin_to_primary()
+        try:
+            response: HttpResponse = self.get_response(request)
+            if sticky() and wrote_to_primary():
+                response.set_cookie(self.COOKIE, '1', httponly=True,
+                                    max_age=settings.REPLICA_STICKY_SECONDS)
+        finally:
+            unpin()
+        return response
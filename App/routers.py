@@ -0,0 +1,70 @@
+'''Database router sending the reads of the catalogue (settings.REPLICA_APPS)
+to the "replica" database, when it is configured. Everything else, writes
+included, goes to the primary ("default") database.
+Sticky after write: once a thread wrote to the primary, its reads go to the
+primary as well, until unpin() (called at the end of each request by
+App.middleware.ReplicaStickinessMiddleware, which keeps the clients that
+wrote on the primary for settings.REPLICA_STICKY_SECONDS, to hide the
+replication lag)'''
+from typing import Any, Optional
+import threading
+from django.conf import settings
+from django.db import connections, DEFAULT_DB_ALIAS
+
+REPLICA_DB_ALIAS: str = 'replica'
+
+_state: threading.local = threading.local()
+
+
+def pin_to_primary() -> None:
+    '''Send the reads of the current thread to the primary'''
+    _state.pinned = True
+
+
+def record_write() -> None:
+    _state.wrote = True
+
+
+def unpin() -> None:
+    _state.pinned = _state.wrote = False
+
+
+def wrote_to_primary() -> bool:
+    return getattr(_state, 'wrote', False)
+
+
+def pinned_to_primary() -> bool:
+    return getattr(_state, 'pinned', False) or wrote_to_primary()
+
+
+def sticky() -> bool:
+    return getattr(settings, 'REPLICA_STICKY_SECONDS', 0) > 0
+
+
+class ReplicaRouter:
+    def db_for_read(self, model: Any, **hints: Any) -> Optional[str]:
+        if REPLICA_DB_ALIAS not in settings.DATABASES or \
+                model._meta.app_label not in settings.REPLICA_APPS:
+            return None
+        if (sticky() and pinned_to_primary()) or \
+                connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS  # Must see the writes of the thread
+        return REPLICA_DB_ALIAS
+
+    def db_for_write(self, model: Any, **hints: Any) -> str:
+        record_write()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1: Any, obj2: Any,
+                       **hints: Any) -> Optional[bool]:
+        '''The replica holds the same data as the primary'''
+        databases: Any = {DEFAULT_DB_ALIAS, REPLICA_DB_ALIAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db: str, app_label: str,
+                      **hints: Any) -> Optional[bool]:
+        if db == REPLICA_DB_ALIAS:
+            return False  # Replicated from the primary
+        return None
@@ -1,8 +1,59 @@
 $().ready(function() {
+    // Responses of /food/ajax by normalized term: {results, complete}
+    var cache = {};
+    var pending = null;
+
+    // Same as Food.text.normalize: lowercase, w/o accents nor extra spaces
+    function normalize(text) {
+        return text.normalize("NFKD").replace(/[\u0300-\u036f]/g, "")
+            .toLowerCase().split(/\s+/).filter(Boolean).join(" ");
+    }
+
+    // Results of the term from the cache: its own response, or the
+    // complete response of a shorter prefix filtered locally
+    function cachedResults(term) {
+        if (cache.hasOwnProperty(term)) {
+            return cache[term].results;
+        }
+        for (var length = term.length - 1; length >= 2; length--) {
+            var entry = cache[term.slice(0, length)];
+            if (entry && entry.complete) {
+                var results = entry.results.filter(function(name) {
+                    return normalize(name).indexOf(term) === 0;
+                });
+                cache[term] = {results: results, complete: true};
+                return results;
+            }
+        }
+        return null;
+    }
+
     $("input.food_search").autocomplete({
         html: true,
-        source: "/food/ajax",
+        delay: 250,
         minLength: 2,
+        source: function(request, response) {
+            var term = normalize(request.term);
+            var results = cachedResults(term);
+            if (results !== null) {
+                response(results);
+                return;
+            }
+            if (pending) {
+                pending.abort();  // Outdated
+            }
+            pending = $.getJSON("/food/ajax", {term: request.term})
+                .done(function(data) {
+                    cache[term] = data;
+                    response(data.results);
+                })
+                .fail(function() {
+                    response([]);
+                })
+                .always(function() {
+                    pending = null;
+                });
+        },
         open: function() {
             setTimeout(function() {
                 $(".ui-autocomplete").css("z-index", 99);
@@ -1,5 +1,22 @@
-from django.http import HttpResponse
-from django.test import Client, TestCase
+from typing import Any
+from unittest import mock
+import os
+import tempfile
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.http import HttpRequest, HttpResponse
+from django.test import (Client, override_settings, RequestFactory,
+                         SimpleTestCase, TestCase)
+from App.db import pragma_statements
+from App.management.commands.profile_startup import parse_import_times
+from App.middleware import ReplicaStickinessMiddleware
+from App.routers import (pin_to_primary, pinned_to_primary, ReplicaRouter,
+                         unpin)
+from Favorite.models import Favorite
+from Food.models import Product
 
 
 class TestAppViews(TestCase):
@@ -13,3 +30,147 @@ class TestAppViews(TestCase):
     def test_get_legal_notices(self) -> None:
         response: HttpResponse = self.client.get('/legal')
         self.assertTemplateUsed(response, 'legal_notice.html')
+
+
+class TestSqliteTuning(TestCase):
+    def pragma(self, conn: Any, name: str) -> Any:
+        with conn.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragma_statements(self) -> None:
+        self.assertEqual(pragma_statements({'synchronous': 'normal',
+                                            'cache_size': -2000}),
+                         ['PRAGMA synchronous = normal',
+                          'PRAGMA cache_size = -2000'])
+        with self.assertRaises(ValueError):
+            pragma_statements({'synchronous': 'off; DROP TABLE x'})
+
+    def test_connection_tuned(self) -> None:
+        self.assertEqual(self.pragma(connection, 'synchronous'), 1)
+        self.assertEqual(self.pragma(connection, 'cache_size'), -65536)
+
+    def test_wal_on_file_database(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            conn: DatabaseWrapper = DatabaseWrapper({
+                **connection.settings_dict,
+                'NAME': os.path.join(tmp_dir, 'db.sqlite3'),
+            })
+            try:
+                self.assertEqual(self.pragma(conn, 'journal_mode'), 'wal')
+                self.assertEqual(self.pragma(conn, 'busy_timeout'), 20000)
+            finally:
+                conn.close()
+
+
+@mock.patch.dict(settings.DATABASES, {'replica': {}})
+class TestReplicaRouter(SimpleTestCase):
+    def setUp(self) -> None:
+        self.router: ReplicaRouter = ReplicaRouter()
+        unpin()
+
+    def tearDown(self) -> None:
+        unpin()
+
+    def test_catalogue_reads_on_replica(self) -> None:
+        self.assertEqual(self.router.db_for_read(Product), 'replica')
+        self.assertIsNone(self.router.db_for_read(Favorite))
+        self.assertEqual(self.router.db_for_write(Product), 'default')
+
+    def test_sticky_after_write(self) -> None:
+        self.router.db_for_write(Favorite)
+        self.assertEqual(self.router.db_for_read(Product), 'default')
+        unpin()
+        self.assertEqual(self.router.db_for_read(Product), 'replica')
+
+    @override_settings(REPLICA_STICKY_SECONDS=0)
+    def test_not_sticky(self) -> None:
+        self.router.db_for_write(Favorite)
+        self.assertEqual(self.router.db_for_read(Product), 'replica')
+
+    def test_no_migration_on_replica(self) -> None:
+        self.assertFalse(self.router.allow_migrate('replica', 'Food'))
+        self.assertIsNone(self.router.allow_migrate('default', 'Food'))
+
+    def test_no_replica(self) -> None:
+        with mock.patch.dict(settings.DATABASES):
+            del settings.DATABASES['replica']
+            self.assertIsNone(self.router.db_for_read(Product))
+
+
+class TestReplicaStickinessMiddleware(SimpleTestCase):
+    def setUp(self) -> None:
+        self.factory: RequestFactory = RequestFactory()
+        self.pinned: bool = False
+
+    def view(self, write: bool) -> Any:
+        def get_response(request: HttpRequest) -> HttpResponse:
+            if write:
+                ReplicaRouter().db_for_write(Favorite)
+            self.pinned = pinned_to_primary()
+            return HttpResponse()
+        return ReplicaStickinessMiddleware(get_response)
+
+    def test_write_sets_cookie(self) -> None:
+        response: HttpResponse = self.view(True)(self.factory.post('/'))
+        self.assertEqual(response.cookies['pin_primary']['max-age'],
+                         settings.REPLICA_STICKY_SECONDS)
+        self.assertFalse(pinned_to_primary())  # Reset after the request
+
+    def test_cookie_pins_to_primary(self) -> None:
+        request: HttpRequest = self.factory.get('/')
+        request.COOKIES['pin_primary'] = '1'
+        response: HttpResponse = self.view(False)(request)
+        self.assertTrue(self.pinned)
+        self.assertNotIn('pin_primary', response.cookies)
+
+    def test_read_only_request(self) -> None:
+        pin_to_primary()  # Left over by a previous request of the thread
+        response: HttpResponse = self.view(False)(self.factory.get('/'))
+        self.assertFalse(self.pinned)
+        self.assertNotIn('pin_primary', response.cookies)
+
+
+class TestStaticFiles(TestCase):
+    STORAGE: str = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+
+    def test_fingerprinted_compressed_assets(self) -> None:
+        with tempfile.TemporaryDirectory() as static_root, \
+                self.settings(STATIC_ROOT=static_root,
+                              STATICFILES_STORAGE=self.STORAGE):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            self.assertFalse(os.path.exists(os.path.join(static_root,
+                                                         'scss')))
+            page: str = self.client.get('/').content.decode()
+            self.assertNotIn('/static/js/ajax-search.js"', page)
+            url: str = page.split('src="/static/js/ajax-search.')[1]
+            url = f'/static/js/ajax-search.{url.split(chr(34))[0]}'
+            response: HttpResponse = self.client.get(
+                url, HTTP_ACCEPT_ENCODING='gzip'
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertIn('immutable', response['Cache-Control'])
+            response.close()
+
+
+class TestProfileStartup(SimpleTestCase):
+    def test_parse_import_times(self) -> None:
+        self.assertEqual(parse_import_times(
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       120 |        120 |     django.utils\n'
+            'import time:      3012 |       3132 |   django\n'
+            'Traceback (most recent call last):\n'
+        ), [('django.utils', 120, 120, 2), ('django', 3012, 3132, 1)])
+
+    def test_failed_import(self) -> None:
+        for stderr, message in (
+            ('import time:       120 |        120 |     django\n'
+             'ImportError: No module named x\n', 'ImportError'),
+            ('', 'return code -9'),  # Killed
+        ):
+            with mock.patch('subprocess.run', return_value=mock.Mock(
+                returncode=-9 if not stderr else 1, stderr=stderr
+            )):
+                with self.assertRaisesMessage(CommandError, message):
+                    call_command('profile_startup')
@@ -41,8 +41,33 @@ class TestFavoriteView(TestCase):
             'substituted': self.bad_product.barcode,
             'substitute': self.good_product.barcode
         })
-        status: str = json.loads(response.content.decode('utf-8'))['status']
-        self.assertEqual(status, 'success')
+        self.assertEqual(json.loads(response.content.decode('utf-8')), {
+            'v': 1, 'status': 'success',
+            'substituted': self.bad_product.barcode,
+            'substitute': self.good_product.barcode,
+        })
+
+    def test_insert_favorite_twice(self) -> None:
+        self.client.login(username=self.email, password=self.password)
+        for __ in range(2):
+            response: HttpResponse = self.client.post(self.URL, {
+                'substituted': self.bad_product.barcode,
+                'substitute': self.good_product.barcode
+            })
+            status: str = json.loads(
+                response.content.decode('utf-8')
+            )['status']
+            self.assertEqual(status, 'success')
+        self.assertEqual(Favorite.objects.filter(user=self.user).count(), 1)
+
+    def test_insert_favorite_unknown_product(self) -> None:
+        self.client.login(username=self.email, password=self.password)
+        response: HttpResponse = self.client.post(self.URL, {
+            'substituted': self.bad_product.barcode, 'substitute': '0'
+        })
+        self.assertEqual(json.loads(response.content.decode('utf-8')),
+                         {'v': 1, 'status': 'error'})
+        self.assertFalse(Favorite.objects.exists())
 
     def test_insert_new_favorite_no_user(self) -> None:
         response: HttpResponse = self.client.post(self.URL, {
@@ -1,6 +1,7 @@
-from typing import Optional
+from typing import Dict, Optional
+from django.db import transaction
 from django.db.models.query import QuerySet
-from django.forms.models import model_to_dict
+from django.db.utils import IntegrityError
 from django.http import HttpRequest, HttpResponse, JsonResponse
 from django.shortcuts import render
 from django.views.generic import View
@@ -10,26 +11,36 @@ from User.models import User
 
 
 class SaveView(View):
+    '''Save the favorite (substitute, substituted) of the user. The JSON
+    response only holds what the save button uses (version SCHEMA):
+    {"v": 1, "status": "success"|"error", "substitute": <barcode>,
+    "substituted": <barcode>}, the barcodes being sent on success only'''
+    SCHEMA: int = 1
+
     def post(self, request: HttpRequest) -> HttpResponse:
         user: User = request.user  # type: ignore
         if user.is_authenticated:
-            substituted: Optional[Product] = Product.objects.filter(
-                barcode=request.POST.get('substituted')
-            ).first()
-            substitute: Optional[Product] = Product.objects.filter(
-                barcode=request.POST.get('substitute')
-            ).first()
-            Favorite.objects.create(
-                user=user,
-                substituted=substituted,
-                substitute=substitute
-            )
-            return JsonResponse({
-                'status': 'success',
-                'substitute': model_to_dict(substitute),  # type: ignore
-                'substituted': model_to_dict(substituted)  # type: ignore
-            })
-        return JsonResponse({'status': 'error'})
+            barcodes: Dict[str, Optional[str]] = {
+                key: request.POST.get(key)
+                for key in ('substitute', 'substituted')
+            }
+            product_ids: Dict[str, int] = dict(Product.objects.filter(
+                barcode__in=barcodes.values()
+            ).values_list('barcode', 'pk'))
+            if all(barcode in product_ids for barcode in barcodes.values()):
+                try:
+                    with transaction.atomic():
+                        Favorite.objects.create(
+                            user=user, **{
+                                f'{key}_id': product_ids[barcode]
+                                for key, barcode in barcodes.items()
+                            }
+                        )
+                except IntegrityError:  # Already saved
+                    pass
+                return JsonResponse({'v': self.SCHEMA, 'status': 'success',
+                                     **barcodes})
+        return JsonResponse({'v': self.SCHEMA, 'status': 'error'})
 
 
 class DeleteView(View):
@@ -1,3 +1,24 @@
+from typing import Dict, Sequence
 from django.contrib import admin
+from django.utils.translation import gettext_lazy as _
+from .models import Category, Product
+from .stats import category_histogram
 
-# Register your models here.
+
+@admin.register(Category)
+class CategoryAdmin(admin.ModelAdmin):
+    list_display: Sequence[str] = ('name', 'nb_products', 'grade_histogram',)
+    search_fields: Sequence[str] = ('name',)
+    raw_id_fields: Sequence[str] = ('products',)
+
+    def nb_products(self, category: Category) -> int:
+        return sum(category_histogram(category.pk).values())
+    nb_products.short_description = _('products')  # type: ignore
+
+    def grade_histogram(self, category: Category) -> str:
+        histogram: Dict[str, int] = category_histogram(category.pk)
+        return ' | '.join(f'{grade}: {histogram.get(grade, 0)}'
+                          for grade, __ in Product.NUTRITION_GRADES)
+    grade_histogram.short_description = _(  # type: ignore
+        'products by nutrition grade'
+    )
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class FoodConfig(AppConfig):
     name = 'Food'
+
+    def ready(self) -> None:
+        from Food import signals  # noqa
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+'''Substitute engines answering the catalogue lookups of the Food views.
+The engine in use is set by settings.FOOD_SUBSTITUTE_ENGINE (dotted path)'''
+from bisect import bisect_left
+from collections import Counter, OrderedDict
+from copy import copy
+from functools import lru_cache
+from itertools import chain, islice
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple, Type
+import heapq
+import threading
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections, DatabaseError
+from django.utils.module_loading import import_string
+from Food.fuzzy import FuzzyIndex
+from Food.models import Category, Product
+from Food.text import normalize, tokenize
+
+
+DEFAULT_ENGINE: str = 'Food.engines.OrmEngine'
+CATALOGUE_VERSION_KEY: str = 'Food:catalogue_version'
+NB_SUBSTITUTES: int = 6
+
+
+def _catalogue_cache():  # type: ignore
+    return caches[getattr(settings, 'FOOD_CATALOGUE_CACHE', 'default')]
+
+
+def catalogue_version_is_shared() -> bool:
+    '''Whether the catalogue version is shared by the processes: a
+    per-process cache (e.g. LocMemCache) misses the bumps of the imports,
+    which run in their own process'''
+    return not isinstance(_catalogue_cache(), (LocMemCache, DummyCache))
+
+
+def catalogue_version() -> int:
+    '''Current version of the catalogue, shared through the cache'''
+    return _catalogue_cache().get(CATALOGUE_VERSION_KEY, 0)
+
+
+def bump_catalogue_version() -> None:
+    '''Flag the catalogue as modified, so that the engines rebuild
+    their in-memory data on their next lookup'''
+    cache = _catalogue_cache()
+    try:
+        cache.incr(CATALOGUE_VERSION_KEY)
+    except ValueError:  # Key missing (first bump or evicted)
+        cache.set(CATALOGUE_VERSION_KEY, 1, None)
+
+
+class SubstituteEngine:
+    '''Interface shared by every substitute engine
+    Class attributes:
+        IN_MEMORY:  Whether the engine holds the catalogue in memory (it
+                    then needs a shared catalogue version, see get_engine)'''
+    IN_MEMORY: bool = False
+
+    def __init__(self) -> None:
+        self.fuzzy_index: Optional[FuzzyIndex] = None
+        self.fuzzy_version: Optional[int] = None
+        self.fuzzy_thread: Optional[threading.Thread] = None
+        self.fuzzy_lock: threading.Lock = threading.Lock()
+
+    def warm_up(self) -> None:
+        '''Prepare the engine (called at worker start)'''
+        self.rebuild_fuzzy_index()
+
+    def rebuild_fuzzy_index(self) -> None:
+        '''Build the fuzzy index of the catalogue, then swap it in'''
+        version: int = catalogue_version()
+        fuzzy_index: FuzzyIndex = FuzzyIndex(self._product_names())
+        self.fuzzy_index, self.fuzzy_version = fuzzy_index, version
+
+    def rebuild_fuzzy_index_in_background(self) -> None:
+        '''Rebuild the fuzzy index in a thread (unless one already does)'''
+        with self.fuzzy_lock:
+            if self.fuzzy_thread is not None and self.fuzzy_thread.is_alive():
+                return
+            self.fuzzy_thread = threading.Thread(
+                target=self._rebuild_fuzzy_index_thread, daemon=True
+            )
+            self.fuzzy_thread.start()
+
+    def _rebuild_fuzzy_index_thread(self) -> None:
+        try:
+            self.rebuild_fuzzy_index()
+        except DatabaseError:  # E.g. not migrated: built by the first lookup
+            pass
+        finally:
+            connections.close_all()  # The connections of the thread
+
+    def find_product(self, name: str) -> Optional[Product]:
+        '''Return the product named "name", ignoring case, accents and
+        extra whitespaces (or None)'''
+        raise NotImplementedError
+
+    def find_product_starting_with(self, search: str) -> Optional[Product]:
+        '''Return the first product (by normalized name) whose name starts
+        with "search", ignoring case, accents and extra whitespaces'''
+        if not normalize(search):
+            return None
+        return Product.starting_with(search).first()
+
+    def find_similar_product(self, name: str) -> Optional[Product]:
+        '''Return the product whose name is the closest to "name" (or None
+        if none is close enough). The fuzzy index is built by warm_up; once
+        the catalogue version changes, the lookups keep using it while its
+        successor is built in the background'''
+        if self.fuzzy_index is None:  # Not warmed up
+            self.rebuild_fuzzy_index()
+        elif self.fuzzy_version != catalogue_version():
+            self.rebuild_fuzzy_index_in_background()
+        return self._find_similar_product(name)
+
+    def _find_similar_product(self, name: str) -> Optional[Product]:
+        match: Optional[str] = self.fuzzy_index.best_match(  # type: ignore
+            name
+        )
+        return self.find_product(match) if match is not None else None
+
+    def _product_names(self) -> Iterable[str]:
+        return Product.objects.values_list('name', flat=True).iterator()
+
+    def get_substitutes_for(self, product: Product) -> List[Product]:
+        '''Return the best substitutes for the product'''
+        raise NotImplementedError
+
+
+class OrmEngine(SubstituteEngine):
+    '''Engine querying the database on every lookup'''
+    def find_product(self, name: str) -> Optional[Product]:
+        return Product.objects.filter(search_name=normalize(name)).first()
+
+    def get_substitutes_for(self, product: Product) -> List[Product]:
+        return list(Product.get_substitutes_for(product))
+
+
+class MemoryEngine(SubstituteEngine):
+    '''Engine holding the whole catalogue in memory as per-category lists
+    of products sorted by nutrition grade, and its fuzzy index. They are
+    rebuilt lazily once the catalogue version changes (see
+    bump_catalogue_version)'''
+    IN_MEMORY: bool = True
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.version: Optional[int] = None
+        self.products_by_name: Dict[str, Product] = {}
+        self.search_names: List[str] = []
+        self.category_of: Dict[int, int] = {}
+        self.products_by_category: Dict[int, List[Product]] = {}
+        self.grades_by_category: Dict[int, List[str]] = {}
+
+    def warm_up(self) -> None:
+        self._check_version()
+
+    def rebuild(self) -> None:
+        '''Load the catalogue from the database'''
+        version: int = catalogue_version()
+        products: Dict[int, Product] = {}
+        products_by_name: Dict[str, Product] = {}
+        for product in Product.objects.all():  # Ordered by name then grade
+            products[product.pk] = product
+            products_by_name.setdefault(product.search_name, product)
+        category_of: Dict[int, int] = {}
+        products_by_category: Dict[int, List[Product]] = {}
+        links = Category.products.through.objects.order_by(  # type: ignore
+            'category__name', 'category_id'
+        ).values_list('product_id', 'category_id')
+        for product_id, category_id in links:
+            # Mimics product.category_set.first() (categories ordered by name)
+            category_of.setdefault(product_id, category_id)
+            products_by_category.setdefault(category_id, []).append(
+                products[product_id]
+            )
+        for category_products in products_by_category.values():
+            category_products.sort(key=lambda p: (p.nutrition_grade, p.name))
+        self.products_by_name = products_by_name
+        self.search_names = sorted(products_by_name)
+        self.category_of = category_of
+        self.products_by_category = products_by_category
+        self.grades_by_category = {
+            category_id: [p.nutrition_grade for p in category_products]
+            for category_id, category_products in products_by_category.items()
+        }
+        self.fuzzy_index, self.fuzzy_version = (
+            FuzzyIndex(self.search_names), version
+        )
+        self.version = version
+
+    def _check_version(self) -> None:
+        if self.version != catalogue_version():
+            self.rebuild()
+
+    def find_product(self, name: str) -> Optional[Product]:
+        self._check_version()
+        product: Optional[Product] = self.products_by_name.get(
+            normalize(name)
+        )
+        return copy(product) if product is not None else None
+
+    def find_product_starting_with(self, search: str) -> Optional[Product]:
+        self._check_version()
+        prefix: str = normalize(search)
+        idx: int = bisect_left(self.search_names, prefix)
+        if (not prefix or idx == len(self.search_names)
+                or not self.search_names[idx].startswith(prefix)):
+            return None
+        return copy(self.products_by_name[self.search_names[idx]])
+
+    def find_similar_product(self, name: str) -> Optional[Product]:
+        self._check_version()  # Rebuilds the fuzzy index too
+        return self._find_similar_product(name)
+
+    def get_substitutes_for(self, product: Product) -> List[Product]:
+        self._check_version()
+        category_id: Optional[int] = self.category_of.get(product.pk)
+        if category_id is None:
+            return []
+        nb_better: int = bisect_left(
+            self.grades_by_category[category_id], product.nutrition_grade
+        )
+        return [  # Copies, as the views decorate the products they return
+            copy(p) for p in
+            self.products_by_category[category_id][:min(nb_better,
+                                                        NB_SUBSTITUTES)]
+        ]
+
+
+class RankedEngine(MemoryEngine):
+    '''In-memory engine ranking the better-graded products of the category
+    by grade gain and by name similarity (Jaccard index on the words) with
+    the searched product.
+    Class attributes:
+        GRADE_WEIGHT:  Score given by grade gained (similarity being 0-1)
+        MAX_TOKEN_DF:  Words found in more than this ratio of a category
+                       are not indexed (they don't discriminate products)
+        MIN_TOKEN_DF:  Words found in up to this number of products of a
+                       category are always indexed
+        MAX_RANKINGS:  Number of rankings memoized (least recently used
+                       ones dropped first)'''
+    GRADE_WEIGHT: float = 0.5
+    MAX_TOKEN_DF: float = 0.1
+    MIN_TOKEN_DF: int = 50
+    MAX_RANKINGS: int = 10000
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.grade_levels: Dict[str, int] = {
+            grade: level
+            for level, (grade, __) in enumerate(Product.NUTRITION_GRADES)
+        }
+        self.tokens_of: Dict[int, FrozenSet[str]] = {}
+        self.postings_by_category: Dict[int, Dict[str, List[int]]] = {}
+        self.nb_tokens_by_category: Dict[int, List[int]] = {}
+        self.rankings: 'OrderedDict[int, List[Product]]' = OrderedDict()
+
+    def rebuild(self) -> None:
+        super().rebuild()
+        self.tokens_of = {}
+        self.postings_by_category = {}
+        self.nb_tokens_by_category = {}
+        for category_id, products in self.products_by_category.items():
+            postings: Dict[str, List[int]] = {}
+            for idx, product in enumerate(products):
+                tokens: FrozenSet[str] = tokenize(product.name)
+                self.tokens_of[product.pk] = tokens
+                for token in tokens:
+                    postings.setdefault(token, []).append(idx)
+            max_df: float = max(self.MIN_TOKEN_DF,
+                                self.MAX_TOKEN_DF * len(products))
+            postings = {
+                token: indexes for token, indexes in postings.items()
+                if len(indexes) <= max_df
+            }
+            self.postings_by_category[category_id] = postings
+            self.nb_tokens_by_category[category_id] = [
+                sum(1 for token in self.tokens_of[p.pk] if token in postings)
+                for p in products
+            ]
+        self.rankings = OrderedDict()
+
+    def get_substitutes_for(self, product: Product) -> List[Product]:
+        self._check_version()
+        ranking: Optional[List[Product]] = self.rankings.get(product.pk)
+        if ranking is None:
+            ranking = self.rankings[product.pk] = self._rank(product)
+            if len(self.rankings) > self.MAX_RANKINGS:
+                self.rankings.popitem(last=False)
+        else:
+            self.rankings.move_to_end(product.pk)
+        return [copy(p) for p in ranking]
+
+    def _rank(self, product: Product) -> List[Product]:
+        '''Score the better-graded products of the category sharing words
+        with the product, and the best-graded ones sharing none'''
+        category_id: Optional[int] = self.category_of.get(product.pk)
+        if category_id is None:
+            return []
+        products: List[Product] = self.products_by_category[category_id]
+        postings: Dict[str, List[int]] = self.postings_by_category[
+            category_id
+        ]
+        nb_better: int = bisect_left(
+            self.grades_by_category[category_id], product.nutrition_grade
+        )
+        nb_tokens: List[int] = self.nb_tokens_by_category[category_id]
+        tokens: List[str] = [
+            token for token in self.tokens_of.get(product.pk, ())
+            if token in postings
+        ]
+        overlaps: Dict[int, int] = {
+            idx: overlap for idx, overlap in Counter(
+                chain.from_iterable(postings[token] for token in tokens)
+            ).items() if idx < nb_better
+        }
+        unrelated: List[Tuple[int, int]] = list(islice(
+            ((idx, 0) for idx in range(nb_better) if idx not in overlaps),
+            NB_SUBSTITUTES
+        ))
+        level: int = self.grade_levels[product.nutrition_grade]
+
+        def score(candidate: Tuple[int, int]) -> Tuple[float, int]:
+            idx, overlap = candidate
+            substitute: Product = products[idx]
+            gain: int = level - self.grade_levels[substitute.nutrition_grade]
+            union: int = len(tokens) + nb_tokens[idx] - overlap
+            similarity: float = overlap / union if union else 0.
+            return (gain * self.GRADE_WEIGHT + similarity, -idx)
+
+        best: List[Tuple[int, int]] = heapq.nlargest(
+            NB_SUBSTITUTES, chain(overlaps.items(), unrelated), key=score
+        )
+        return [products[idx] for idx, __ in best]
+
+
+@lru_cache(maxsize=None)
+def _load_engine(path: str) -> SubstituteEngine:
+    engine_class: Type[SubstituteEngine] = import_string(path)
+    if engine_class.IN_MEMORY and not catalogue_version_is_shared():
+        raise ImproperlyConfigured(
+            f'{path} holds the catalogue in memory: it needs a shared cache '
+            f'(CACHE_BACKEND) to see the imports, run in their own process'
+        )
+    return engine_class()
+
+
+def get_engine() -> SubstituteEngine:
+    '''Return the (per-process) instance of the configured engine'''
+    return _load_engine(
+        getattr(settings, 'FOOD_SUBSTITUTE_ENGINE', DEFAULT_ENGINE)
+    )
+
+
+def warm_up_engine() -> None:
+    '''Prepare the configured engine at worker start: the in-memory engines
+    load the catalogue (unless the database isn't migrated yet, their first
+    lookup loading it then), the others build their fuzzy index in the
+    background, not to delay the start'''
+    engine: SubstituteEngine = get_engine()
+    if not engine.IN_MEMORY:
+        engine.rebuild_fuzzy_index_in_background()
+        return
+    try:
+        engine.warm_up()
+    except DatabaseError:
+        pass
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+'''Fuzzy matching of product names, used when the exact lookup misses'''
+from collections import Counter
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from Food.text import normalize
+
+
+def trigrams(text: str) -> Set[str]:
+    '''Set of the 3-grams of the (padded) normalized text'''
+    padded: str = f'  {normalize(text)} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class FuzzyIndex:
+    '''Trigram index over normalized product names. The lookup time is
+    bounded: only the rarest trigrams of the query are looked up (up to
+    MAX_POSTINGS product references) and only the MAX_CANDIDATES names
+    sharing the most trigrams are compared character by character.
+    Class attributes:
+        MAX_POSTINGS:   Maximum number of postings read by lookup
+        MAX_CANDIDATES: Maximum number of names compared by lookup
+        MIN_RATIO:      Minimum similarity ratio (0-1) of a match'''
+    MAX_POSTINGS: int = 20000
+    MAX_CANDIDATES: int = 50
+    MIN_RATIO: float = .75
+
+    def __init__(self, names: Iterable[str]) -> None:
+        self.names: List[str] = []
+        self.normalized_names: List[str] = []
+        self.postings: Dict[str, List[int]] = {}
+        seen: Set[str] = set()
+        for name in names:
+            normalized: str = normalize(name)
+            if normalized in seen:
+                continue
+            seen.add(normalized)
+            idx: int = len(self.names)
+            self.names.append(name)
+            self.normalized_names.append(normalized)
+            for gram in trigrams(name):
+                self.postings.setdefault(gram, []).append(idx)
+
+    def best_match(self, query: str) -> Optional[str]:
+        '''Return the indexed name closest to the query (or None if
+        no name is similar enough)'''
+        normalized: str = normalize(query)
+        if not normalized:
+            return None
+        grams: List[List[int]] = sorted(
+            (self.postings[gram] for gram in trigrams(query)
+             if gram in self.postings),
+            key=len
+        )
+        shared: Counter = Counter()
+        nb_postings: int = 0
+        for postings in grams:
+            if nb_postings + len(postings) > self.MAX_POSTINGS and shared:
+                break
+            shared.update(postings)
+            nb_postings += len(postings)
+        best: Tuple[float, Optional[str]] = (0., None)
+        for idx, __ in shared.most_common(self.MAX_CANDIDATES):
+            ratio: float = SequenceMatcher(
+                None, normalized, self.normalized_names[idx]
+            ).ratio()
+            if ratio > best[0]:
+                best = (ratio, self.names[idx])
+        return best[1] if best[0] >= self.MIN_RATIO else None
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+'''Local cache of the product images: the images of OpenFoodFacts are
+downloaded once (during the imports) and stored as JPEG variants of the
+sizes of settings.FOOD_IMAGE_SIZES, in settings.FOOD_IMAGE_DIR:
+    <FOOD_IMAGE_DIR>/<size>/<key[:2]>/<key>.jpg
+where key is the SHA1 of the URL of the image (so that the variants are
+immutable). The least recently served variants are evicted once the cache
+exceeds settings.FOOD_IMAGE_CACHE_BYTES. The generation of the cache (the
+mtime of <FOOD_IMAGE_DIR>/.generation) changes whenever variants are added
+or evicted.
+The images are resized by Pillow: without it, none is cached (the variants
+would be full-size copies, maybe not even JPEG)'''
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from itertools import chain
+from typing import Iterable, List, Optional, Sequence, Tuple
+import hashlib
+import os
+import re
+import tempfile
+import time
+from django.conf import settings
+import requests
+from Food.models import Product
+
+try:
+    from PIL import Image  # type: ignore
+except ImportError:  # pragma: no cover
+    Image = None
+
+
+MAX_DOWNLOAD_BYTES: int = 10 * 2 ** 20
+TOUCH_INTERVAL: int = 24 * 3600  # Refresh of the mtime (LRU) of a variant
+IMAGE_NAME: re.Pattern = re.compile(r'^[0-9a-f]{40}\.jpg$')
+GENERATION_FILE: str = '.generation'
+
+
+def image_dir() -> str:
+    return settings.FOOD_IMAGE_DIR
+
+
+def image_sizes() -> Sequence[int]:
+    return settings.FOOD_IMAGE_SIZES
+
+
+def image_key(url: str) -> str:
+    return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+
+def variant_path(key: str, size: int) -> str:
+    return os.path.join(image_dir(), str(size), key[:2], f'{key}.jpg')
+
+
+def generation() -> int:
+    '''Generation of the cache, keying the rendered fragments which hold
+    URLs of variants (one stat by page instead of one by image)'''
+    try:
+        return os.stat(os.path.join(image_dir(), GENERATION_FILE)).st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
+
+def bump_generation() -> None:
+    path: str = os.path.join(image_dir(), GENERATION_FILE)
+    os.makedirs(image_dir(), exist_ok=True)
+    with open(path, 'a'):
+        pass
+    now: int = time.time_ns()
+    os.utime(path, ns=(now, now))
+
+
+def cached_variant(url: str, size: int) -> Optional[str]:
+    '''Name of the cached variant of the image (None if not cached)'''
+    if not url or size not in image_sizes():
+        return None
+    key: str = image_key(url)
+    if not os.path.isfile(variant_path(key, size)):
+        return None
+    return f'{key}.jpg'
+
+
+def resize(data: bytes, size: int) -> bytes:
+    '''JPEG of the image scaled down to fit in size x size pixels'''
+    with Image.open(BytesIO(data)) as image:
+        image.thumbnail((size, size))
+        output: BytesIO = BytesIO()
+        image.convert('RGB').save(output, 'JPEG', quality=85,
+                                  optimize=True)
+    return output.getvalue()
+
+
+def _write(path: str, data: bytes) -> None:
+    '''Write the file atomically (the variants may be served meanwhile)'''
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path),
+                                    prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as tmp_file:
+            tmp_file.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def download(url: str, timeout: float = 10) -> bytes:
+    with requests.get(url, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        data: bytes = response.raw.read(MAX_DOWNLOAD_BYTES + 1,
+                                        decode_content=True)
+    if len(data) > MAX_DOWNLOAD_BYTES:
+        raise ValueError(f'{url} is too large')
+    return data
+
+
+def cache_image(url: str) -> bool:
+    '''Download the image (unless all its variants are cached) and store
+    its variants. Return False if it couldn't be downloaded or read (or
+    resized, Pillow missing)'''
+    if Image is None:
+        return False
+    key: str = image_key(url)
+    missing: List[int] = [size for size in image_sizes()
+                          if not os.path.isfile(variant_path(key, size))]
+    if not missing:
+        return True
+    try:
+        data: bytes = download(url)
+        for size in missing:
+            _write(variant_path(key, size), resize(data, size))
+    except (requests.exceptions.RequestException, ValueError, OSError):
+        return False
+    return True
+
+
+def cache_images(urls: Iterable[str], workers: int = 4) -> Tuple[int, int]:
+    '''Cache the images (downloaded by workers threads) then evict the
+    least recently served variants if needed. Return the numbers of
+    images cached and failed'''
+    with ThreadPoolExecutor(workers) as executor:
+        results: List[bool] = list(executor.map(
+            cache_image, {url for url in urls if url}
+        ))
+    if True in results:
+        bump_generation()
+    evict()
+    return (results.count(True), results.count(False))
+
+
+def cache_product_images(workers: int = 4) -> Tuple[int, int]:
+    '''Cache the images (pictures and nutrition facts) of the catalogue'''
+    return cache_images(chain.from_iterable(
+        Product.objects.values_list('img', 'nutrition_img').iterator()
+    ), workers)
+
+
+def touch(path: str) -> None:
+    '''Mark the variant as recently served (at most once by
+    TOUCH_INTERVAL, to spare the writes)'''
+    now: float = time.time()
+    if os.stat(path).st_mtime < now - TOUCH_INTERVAL:
+        os.utime(path, (now, now))
+
+
+def evict(max_bytes: Optional[int] = None) -> int:
+    '''Delete the least recently served variants until the cache is
+    under 90% of max_bytes (settings.FOOD_IMAGE_CACHE_BYTES by default).
+    Return the number of files deleted'''
+    if max_bytes is None:
+        max_bytes = settings.FOOD_IMAGE_CACHE_BYTES
+    files: List[Tuple[float, int, str]] = []
+    for root, __, names in os.walk(image_dir()):
+        for name in names:
+            if name == GENERATION_FILE:
+                continue
+            path: str = os.path.join(root, name)
+            try:
+                stat: os.stat_result = os.stat(path)
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+    total: int = sum(size for __, size, __ in files)
+    if total <= max_bytes:
+        return 0
+    nb_deleted: int = 0
+    for __, size, path in sorted(files):
+        if total <= max_bytes * .9:
+            break
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        nb_deleted += 1
+    bump_generation()
+    return nb_deleted
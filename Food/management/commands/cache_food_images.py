@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+from typing import Any
+import time
+from django.core.management.base import (BaseCommand, CommandError,
+                                         CommandParser)
+from Food.images import cache_product_images, evict, Image
+
+
+class Command(BaseCommand):
+    help: str = ('Downloads the images of the Food catalogue and stores '
+                 'their resized variants in the local image cache')
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--workers', type=int, default=4,
+                            help='Number of concurrent downloads')
+        parser.add_argument('--evict-only', action='store_true',
+                            help='Only evict the least recently served '
+                                 'images over the size of the cache')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        '''Main method of custom command'''
+        start: float = time.perf_counter()
+        if options['evict_only']:
+            print(f'{evict()} files evicted')
+            return
+        if Image is None:
+            raise CommandError('Pillow is required to resize the images')
+        nb_cached, nb_failed = cache_product_images(options['workers'])
+        print(f'{nb_cached} images cached ({nb_failed} failed) '
+              f'in {time.perf_counter() - start:.1f}s')
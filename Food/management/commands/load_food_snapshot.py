@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+from typing import Any, Dict
+import os
+import time
+from django.core.management.base import (BaseCommand, CommandError,
+                                         CommandParser)
+from Food.models import Product
+from Food.snapshot import restore_snapshot
+
+
+class Command(BaseCommand):
+    help: str = ('Seeds the Food catalogue from a snapshot exported by '
+                 'export_food_snapshot (offline, in one transaction)')
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('snapshot', help='Snapshot directory')
+        parser.add_argument('--replace', action='store_true',
+                            help='Replace the current catalogue (and delete'
+                                 ' the favorites)')
+        parser.add_argument('--if-empty', action='store_true',
+                            help='Do nothing if the catalogue is not empty')
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Number of rows inserted by query (default:'
+                                 ' the most the database supports)')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        '''Main method of custom command'''
+        if not os.path.isfile(os.path.join(options['snapshot'],
+                                           'manifest.json')):
+            raise CommandError(f'{options["snapshot"]} is not a snapshot')
+        if options['if_empty'] and Product.objects.exists():
+            print('The catalogue is not empty, nothing to do')
+            return
+        start: float = time.perf_counter()
+        try:
+            rows: Dict[str, int] = restore_snapshot(
+                options['snapshot'], options['replace'],
+                options['batch_size']
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        print(f'Snapshot restored in {time.perf_counter() - start:.1f}s ('
+              + ', '.join(f'{table}: {nb}' for table, nb in rows.items())
+              + ')')
@@ -0,0 +1,28 @@
+# Generated by Django 2.2.28 on 2026-10-19 12:15
+
+from django.db import migrations, models
+from Food.text import normalize
+
+
+def populate_search_name(apps, schema_editor):
+    Product = apps.get_model('Food', 'Product')
+    for pk, name in Product.objects.values_list('pk', 'name').iterator():
+        Product.objects.filter(pk=pk).update(
+            search_name=normalize(name)[:500]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Food', '0005_auto_20190406_1713'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='search_name',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Lowercased name without accents', max_length=500, verbose_name='search name'),
+        ),
+        migrations.RunPython(populate_search_name, migrations.RunPython.noop),
+    ]
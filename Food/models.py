@@ -1,8 +1,10 @@
 from __future__ import annotations
-from typing import List, Sequence, Tuple
-from django.db import models
+from typing import Any, List, Optional, Sequence, Tuple
+import hashlib
+from django.db import connections, models, router
 from django.utils.translation import gettext_lazy as _
 from django.urls import reverse
+from Food.text import normalize
 
 
 class Product(models.Model):
@@ -29,6 +31,10 @@ class Product(models.Model):
     nutrition_img: models.URLField = models.URLField(
         _('nutrition_img'), blank=True
     )
+    search_name: models.CharField = models.CharField(
+        _('search name'), max_length=500, blank=True, editable=False,
+        db_index=True, help_text=_('Lowercased name without accents')
+    )
 
     objects: models.Manager = models.Manager()
 
@@ -41,20 +47,59 @@ class Product(models.Model):
         return (f'<Product#{self.barcode} name={self.name} '
                 f'nutrition_grade={self.nutrition_grade}>')
 
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        self.search_name = normalize(self.name)[:500]
+        super().save(*args, **kwargs)
+
+    def starting_with(search: str) -> models.query.QuerySet:  # type: ignore
+        '''Products whose normalized name starts with the normalized search,
+        matched so that the search_name index is used: by a range on SQLite
+        (whose LIKE ignores the index; its binary collation makes the range
+        exact), by LIKE elsewhere (e.g. PostgreSQL, where Django indexes the
+        CharField w/ varchar_pattern_ops too, and where a range would be
+        wrong under the collations of the locales)'''
+        prefix: str = normalize(search)
+        vendor: str = connections[router.db_for_read(Product)].vendor
+        if vendor == 'sqlite':
+            products = Product.objects.filter(
+                search_name__gte=prefix, search_name__lt=prefix + '\uffff'
+            )
+        else:
+            products = Product.objects.filter(search_name__startswith=prefix)
+        return products.order_by('search_name')
+
     def get_substitutes_for(product: Product) -> models.query.QuerySet:
+        # Circular imports
+        from Food.engines import catalogue_version_is_shared
+        from Food.stats import nb_better_products
+        category: Optional[Category] = product.category_set.first()
+        if category is None:
+            return Product.objects.none()
+        # The histograms are up to date only if the version is shared
+        if catalogue_version_is_shared() and \
+                not nb_better_products(category.pk, product.nutrition_grade):
+            return Product.objects.none()
         nutrition_grades_scale: List[str] = []
         for grade, __ in Product.NUTRITION_GRADES:
             nutrition_grades_scale.append(grade)
         idx: int = nutrition_grades_scale.index(product.nutrition_grade)
         better_grades: List[str] = nutrition_grades_scale[:idx]
         return Product.objects.filter(
-            nutrition_grade__in=better_grades,
-            category=product.category_set.first()  # type: ignore
+            nutrition_grade__in=better_grades, category=category
         ).order_by('nutrition_grade')[:6]
 
     def delete_all() -> None:  # type: ignore
         Product.objects.all().delete()
 
+    @property
+    def fingerprint(self) -> str:
+        '''Hash of the displayed fields, changing when the product is
+        updated (used to key the cached template fragments)'''
+        return hashlib.md5('\n'.join((
+            self.name, self.nutrition_grade, self.url, self.img,
+            self.nutrition_img
+        )).encode('utf-8')).hexdigest()
+
     @property
     def get_absolute_url(self) -> str:
         return reverse('food:product', args=[self.barcode])
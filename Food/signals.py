@@ -0,0 +1,19 @@
+from typing import Any
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from Food.engines import bump_catalogue_version
+from Food.models import Category, Product
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=Category)
+@receiver(m2m_changed, sender=Category.products.through)
+def catalogue_changed(sender: Any, **kwargs: Any) -> None:
+    # Bumped once the transaction is committed (immediately in autocommit
+    # mode): otherwise the workers could rebuild their data from rows not
+    # committed yet, and keep it under the new version
+    if kwargs.get('action', 'post_').startswith('post_'):
+        transaction.on_commit(bump_catalogue_version,
+                              using=kwargs.get('using'))
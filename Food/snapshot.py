@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+'''Columnar snapshot of the Food catalogue (products, categories and the
+links between them), for the batch jobs analysing the catalogue w/o
+querying the web database.
+A snapshot is a directory holding a manifest.json and one file by column:
+    - numeric columns: .npy files (NumPy format 1.0, 1-D little-endian)
+    - string columns: a .bin file (UTF-8 values one after another) along
+      with a .offsets.npy file (n + 1 int64 offsets into the .bin file)
+The nutrition grades are stored as uint8 indexes into the "labels" of
+the column (A=0, ..., E=4), the empty or unknown grades as the "unknown"
+code of the column (255). NumPy isn't required to export or load
+a snapshot, but the loader returns NumPy arrays when it is installed.
+A snapshot can also be restored to (re)seed the catalogue of a database'''
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import array
+import ast
+import json
+import os
+import shutil
+import sys
+import tempfile
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from Food.engines import bump_catalogue_version, catalogue_version
+from Food.models import Category, Product
+from Food.text import normalize
+
+try:
+    import numpy  # type: ignore
+except ImportError:  # pragma: no cover
+    numpy = None
+
+
+SNAPSHOT_VERSION: int = 1
+NPY_MAGIC: bytes = b'\x93NUMPY\x01\x00'
+TYPECODES: Dict[str, str] = {'<i8': 'q', '|u1': 'B'}
+GRADES: List[str] = [grade for grade, __ in Product.NUTRITION_GRADES]
+GRADE_CODES: Dict[str, int] = {
+    grade: code for code, grade in enumerate(GRADES)
+}
+UNKNOWN_GRADE: int = 255
+PRODUCT_STRINGS: Tuple[str, ...] = (
+    'barcode', 'name', 'url', 'img', 'nutrition_img'
+)
+
+
+def _descr(typecode: str) -> str:
+    return {code: descr for descr, code in TYPECODES.items()}[typecode]
+
+
+def write_npy(path: str, values: array.array) -> None:
+    '''Write the values as a 1-D .npy file'''
+    header: str = (f"{{'descr': '{_descr(values.typecode)}', "
+                   f"'fortran_order': False, 'shape': ({len(values)},), }}")
+    # The header (magic, length and dict) is padded to 64 bytes
+    padding: int = 63 - (len(NPY_MAGIC) + 2 + len(header)) % 64
+    header += ' ' * padding + '\n'
+    if sys.byteorder == 'big':  # pragma: no cover
+        values = array.array(values.typecode, values)
+        values.byteswap()
+    with open(path, 'wb') as npy_file:
+        npy_file.write(NPY_MAGIC)
+        npy_file.write(len(header).to_bytes(2, 'little'))
+        npy_file.write(header.encode('latin1'))
+        values.tofile(npy_file)
+
+
+def read_npy(path: str) -> array.array:
+    '''Read the 1-D .npy file written by write_npy w/o NumPy'''
+    with open(path, 'rb') as npy_file:
+        if npy_file.read(len(NPY_MAGIC)) != NPY_MAGIC:
+            raise ValueError(f'{path} is not a .npy file (format 1.0)')
+        header_len: int = int.from_bytes(npy_file.read(2), 'little')
+        header: Dict[str, Any] = ast.literal_eval(
+            npy_file.read(header_len).decode('latin1')
+        )
+        values: array.array = array.array(TYPECODES[header['descr']])
+        values.frombytes(npy_file.read())
+    if sys.byteorder == 'big':  # pragma: no cover
+        values.byteswap()
+    return values
+
+
+class StringColumn:
+    '''Sequence of the strings of a column, decoded on access'''
+    def __init__(self, offsets: Any, data: bytes) -> None:
+        self.offsets: Any = offsets
+        self.data: bytes = data
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, idx: int) -> str:
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError('StringColumn index out of range')
+        return self.data[
+            int(self.offsets[idx]):int(self.offsets[idx + 1])
+        ].decode('utf-8')
+
+    def __iter__(self) -> Iterator[str]:
+        for idx in range(len(self)):
+            yield self[idx]
+
+
+class _TableWriter:
+    '''Write the rows of a table column by column'''
+    def __init__(self, directory: str, table: str,
+                 columns: Dict[str, str]) -> None:
+        self.directory: str = directory
+        self.table: str = table
+        self.columns: Dict[str, str] = columns
+        self.numbers: Dict[str, array.array] = {}
+        self.offsets: Dict[str, array.array] = {}
+        self.blobs: Dict[str, Any] = {}
+        for name, kind in columns.items():
+            if kind == 'string':
+                self.offsets[name] = array.array('q', [0])
+                self.blobs[name] = open(self._path(name, '.bin'), 'wb')
+            else:
+                self.numbers[name] = array.array(
+                    'B' if kind == 'grade' else 'q'
+                )
+        self.nb_rows: int = 0
+
+    def _path(self, column: str, extension: str) -> str:
+        return os.path.join(self.directory,
+                            f'{self.table}.{column}{extension}')
+
+    def write(self, row: Iterable[Any]) -> None:
+        for (name, kind), value in zip(self.columns.items(), row):
+            if kind == 'string':
+                self.offsets[name].append(
+                    self.offsets[name][-1]
+                    + self.blobs[name].write(value.encode('utf-8'))
+                )
+            elif kind == 'grade':
+                self.numbers[name].append(
+                    GRADE_CODES.get(value, UNKNOWN_GRADE)
+                )
+            else:
+                self.numbers[name].append(value)
+        self.nb_rows += 1
+
+    def close(self) -> Dict[str, Any]:
+        '''Write the columns and return the manifest of the table'''
+        for name, values in self.numbers.items():
+            write_npy(self._path(name, '.npy'), values)
+        for name, offsets in self.offsets.items():
+            self.blobs[name].close()
+            write_npy(self._path(name, '.offsets.npy'), offsets)
+        return {
+            'rows': self.nb_rows,
+            'columns': {
+                name: {'kind': kind, 'labels': GRADES,
+                       'unknown': UNKNOWN_GRADE} if kind == 'grade'
+                else {'kind': kind}
+                for name, kind in self.columns.items()
+            },
+        }
+
+
+def export_snapshot(directory: str, batch_size: int = 2000) -> Dict[str, Any]:
+    '''Export the catalogue to the directory (replaced if it exists) and
+    return its manifest. The rows are streamed from the database by
+    batches, ordered by primary key'''
+    parent: str = os.path.dirname(os.path.abspath(directory))
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir: str = tempfile.mkdtemp(dir=parent, prefix='.snapshot-')
+    try:
+        tables: Dict[str, Tuple[Any, Dict[str, str]]] = {
+            'products': (
+                Product.objects.order_by('pk').values_list(
+                    'pk', 'nutrition_grade', *PRODUCT_STRINGS
+                ),
+                {'id': 'int64', 'nutrition_grade': 'grade',
+                 **{name: 'string' for name in PRODUCT_STRINGS}}
+            ),
+            'categories': (
+                Category.objects.order_by('pk').values_list('pk', 'name'),
+                {'id': 'int64', 'name': 'string'}
+            ),
+            'product_categories': (
+                Category.products.through.objects.order_by(  # type: ignore
+                    'category_id', 'product_id'
+                ).values_list('category_id', 'product_id'),
+                {'category_id': 'int64', 'product_id': 'int64'}
+            ),
+        }
+        manifest: Dict[str, Any] = {
+            'version': SNAPSHOT_VERSION,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'catalogue_version': catalogue_version(),
+            'tables': {},
+        }
+        for table, (rows, columns) in tables.items():
+            writer: _TableWriter = _TableWriter(tmp_dir, table, columns)
+            for row in rows.iterator(chunk_size=batch_size):
+                writer.write(row)
+            manifest['tables'][table] = writer.close()
+        with open(os.path.join(tmp_dir, 'manifest.json'), 'w') as out:
+            json.dump(manifest, out, indent=2)
+        if os.path.isdir(directory):
+            shutil.rmtree(directory)
+        os.rename(tmp_dir, directory)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return manifest
+
+
+@dataclass
+class Snapshot:
+    '''Snapshot loaded from its directory: tables are dicts of columns,
+    numeric columns being NumPy arrays (memory-mapped) if NumPy is
+    installed and use_numpy isn't False, array.array otherwise'''
+    directory: str
+    use_numpy: Optional[bool] = None
+
+    def __post_init__(self) -> None:
+        with open(os.path.join(self.directory, 'manifest.json')) as inp:
+            self.manifest: Dict[str, Any] = json.load(inp)
+        if self.manifest['version'] != SNAPSHOT_VERSION:
+            raise ValueError(f'Unsupported snapshot version '
+                             f'{self.manifest["version"]}')
+        if self.use_numpy is None:
+            self.use_numpy = numpy is not None
+        self._tables: Dict[str, Dict[str, Any]] = {}
+
+    def _numbers(self, path: str) -> Any:
+        if self.use_numpy:
+            return numpy.load(path, mmap_mode='r')
+        return read_npy(path)
+
+    def table(self, name: str) -> Dict[str, Any]:
+        '''Columns of the table, by name'''
+        if name not in self._tables:
+            columns: Dict[str, Any] = {}
+            for column, info in \
+                    self.manifest['tables'][name]['columns'].items():
+                path: str = os.path.join(self.directory, f'{name}.{column}')
+                if info['kind'] == 'string':
+                    with open(f'{path}.bin', 'rb') as blob:
+                        columns[column] = StringColumn(
+                            self._numbers(f'{path}.offsets.npy'), blob.read()
+                        )
+                else:
+                    columns[column] = self._numbers(f'{path}.npy')
+            self._tables[name] = columns
+        return self._tables[name]
+
+    @property
+    def products(self) -> Dict[str, Any]:
+        return self.table('products')
+
+    @property
+    def categories(self) -> Dict[str, Any]:
+        return self.table('categories')
+
+    @property
+    def product_categories(self) -> Dict[str, Any]:
+        return self.table('product_categories')
+
+
+def load_snapshot(directory: str,
+                  use_numpy: Optional[bool] = None) -> Snapshot:
+    '''Load the snapshot exported in the directory'''
+    return Snapshot(directory, use_numpy)
+
+
+def restore_snapshot(directory: str, replace: bool = False,
+                     batch_size: Optional[int] = None) -> Dict[str, int]:
+    '''Restore the catalogue from the snapshot (primary keys included)
+    w/ bulk inserts in one transaction. The tables are inserted in the
+    order of their foreign keys (the links last), so that the constraints
+    needn't be disabled (SQLite can't within a transaction); the deferred
+    ones are checked once at the end. The current catalogue is deleted
+    first if replace is True (along w/ the favorites), otherwise it must
+    be empty.
+    By default, the batch size is the largest one the database supports.
+    Return the number of rows restored by table'''
+    snapshot: Snapshot = load_snapshot(directory, use_numpy=False)
+    Link: Any = Category.products.through  # type: ignore
+    with transaction.atomic():
+        if replace:
+            Category.delete_all()
+            Product.delete_all()
+        elif Product.objects.exists() or Category.objects.exists():
+            raise ValueError('The catalogue is not empty (replace it to '
+                             'restore the snapshot)')
+        products: Dict[str, Any] = snapshot.products
+        labels: Dict[int, str] = dict(enumerate(
+            snapshot.manifest['tables']['products']['columns'][
+                'nutrition_grade']['labels']
+        ))
+        Product.objects.bulk_create((
+            Product(pk=pk, nutrition_grade=labels.get(grade, ''),
+                    search_name=normalize(values['name'])[:500], **values)
+            for pk, grade, values in zip(
+                products['id'], products['nutrition_grade'],
+                (dict(zip(PRODUCT_STRINGS, row)) for row in zip(
+                    *(products[name] for name in PRODUCT_STRINGS)
+                ))
+            )
+        ), batch_size=batch_size)
+        categories: Dict[str, Any] = snapshot.categories
+        Category.objects.bulk_create((
+            Category(pk=pk, name=name)
+            for pk, name in zip(categories['id'], categories['name'])
+        ), batch_size=batch_size)
+        links: Dict[str, Any] = snapshot.product_categories
+        Link.objects.bulk_create((
+            Link(category_id=category_id, product_id=product_id)
+            for category_id, product_id in zip(links['category_id'],
+                                               links['product_id'])
+        ), batch_size=batch_size)
+        connection.check_constraints(table_names=[
+            Product._meta.db_table, Category._meta.db_table,
+            Link._meta.db_table
+        ])
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(
+                no_style(), [Product, Category, Link]
+            ):
+                cursor.execute(sql)
+        # Bumped once committed (see Food.signals), the restore possibly
+        # running within the transaction of the caller
+        transaction.on_commit(bump_catalogue_version)
+    return {table: info['rows']
+            for table, info in snapshot.manifest['tables'].items()}
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+'''Number of products by category and nutrition grade, computed by a single
+GROUP BY query. The histograms are cached along w/ the catalogue version,
+so that they are refreshed once the catalogue changes (the imports being
+seen only through a shared cache, see catalogue_version_is_shared)'''
+from typing import Any, Dict
+from django.db.models import Count
+from Food.engines import _catalogue_cache, catalogue_version
+from Food.models import Category
+
+
+HISTOGRAMS_KEY: str = 'Food:grade_histograms:{version}'
+HISTOGRAMS_TIMEOUT: int = 24 * 3600
+_histograms: Dict[str, Any] = {'version': None, 'histograms': {}}
+
+
+def grade_histograms() -> Dict[int, Dict[str, int]]:
+    '''Number of products by grade, by category id (memoized by process
+    and shared through the cache for the current catalogue version)'''
+    version: int = catalogue_version()
+    if _histograms['version'] != version:
+        key: str = HISTOGRAMS_KEY.format(version=version)
+        histograms: Dict[int, Dict[str, int]] = _catalogue_cache().get(key)
+        if histograms is None:
+            histograms = {}
+            Link: Any = Category.products.through  # type: ignore
+            for row in Link.objects.values(
+                'category_id', 'product__nutrition_grade'
+            ).annotate(nb=Count('pk')).order_by():
+                histograms.setdefault(row['category_id'], {})[
+                    row['product__nutrition_grade']
+                ] = row['nb']
+            _catalogue_cache().set(key, histograms, HISTOGRAMS_TIMEOUT)
+        _histograms.update(version=version, histograms=histograms)
+    return _histograms['histograms']
+
+
+def category_histogram(category_id: int) -> Dict[str, int]:
+    '''Number of products of the category by grade'''
+    return grade_histograms().get(category_id, {})
+
+
+def nb_better_products(category_id: int, grade: str) -> int:
+    '''Number of products of the category graded better than grade'''
+    return sum(nb for other_grade, nb in category_histogram(category_id)
+               .items() if other_grade < grade)
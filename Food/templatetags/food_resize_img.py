@@ -1,8 +1,16 @@
+from typing import Optional
 from django import template
+from django.urls import reverse
+from Food.images import cached_variant
 
 register = template.Library()
 
 
 @register.filter
 def resize_img(img_url: str, length: str = '400') -> str:
+    '''URL of the locally cached variant of the image (see Food.images),
+    or of the variant served by OpenFoodFacts if it isn't cached'''
+    name: Optional[str] = cached_variant(img_url, int(length))
+    if name is not None:
+        return reverse('food:image', args=(int(length), name))
     return img_url.replace('.full.', f'.{length}.')
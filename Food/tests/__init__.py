@@ -0,0 +1,11 @@
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+def run_on_commit(using: str = DEFAULT_DB_ALIAS) -> None:
+    '''Run the callbacks registered by transaction.on_commit (e.g. the bump
+    of the catalogue version), which TestCase never commits'''
+    connection = connections[using]
+    callbacks = connection.run_on_commit
+    connection.run_on_commit = []
+    for __, callback in callbacks:
+        callback()
@@ -0,0 +1,209 @@
+from typing import List
+import tempfile
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from Food.engines import (bump_catalogue_version, catalogue_version,
+                          get_engine, MemoryEngine, OrmEngine, RankedEngine,
+                          SubstituteEngine, warm_up_engine)
+from Food.models import Category, Product
+from Food.tests import run_on_commit
+from Food.text import normalize, tokenize
+
+
+class TestEngines(TestCase):
+    def setUp(self) -> None:
+        self.bad_product: Product = Product.objects.create(
+            barcode='789123', name='Bad Product',
+            nutrition_grade='D', url='http://example2.com',
+        )
+        self.good_product: Product = Product.objects.create(
+            barcode='123456', name='Good Product',
+            nutrition_grade='A', url='http://example.com',
+        )
+        self.medium_product: Product = Product.objects.create(
+            barcode='456789', name='Medium Product',
+            nutrition_grade='C', url='http://example3.com',
+        )
+        self.other_product: Product = Product.objects.create(
+            barcode='147258', name='Other Product',
+            nutrition_grade='A', url='http://example4.com',
+        )
+        self.catego: Category = Category.objects.create(name='Category 1')
+        self.catego.products.add(self.bad_product, self.good_product,
+                                 self.medium_product)
+        Category.objects.create(name='Category 2').products.add(
+            self.other_product
+        )
+
+    def test_engines_find_product(self) -> None:
+        for engine in (OrmEngine(), MemoryEngine()):
+            self.assertEqual(engine.find_product('Bad Product'),
+                             self.bad_product)
+            self.assertIsNone(engine.find_product('Unknown Product'))
+
+    def test_engines_find_product_starting_with(self) -> None:
+        for engine in (OrmEngine(), MemoryEngine()):
+            self.assertEqual(engine.find_product_starting_with('med'),
+                             self.medium_product)
+            self.assertEqual(engine.find_product('bad  PRODUCT'),
+                             self.bad_product)
+            self.assertIsNone(engine.find_product_starting_with('Unknown'))
+            self.assertIsNone(engine.find_product_starting_with(' '))
+
+    def test_engines_same_substitutes(self) -> None:
+        for product in Product.objects.all():
+            self.assertEqual(
+                OrmEngine().get_substitutes_for(product),
+                MemoryEngine().get_substitutes_for(product)
+            )
+
+    def test_memory_engine_substitutes(self) -> None:
+        substitutes: List[Product] = MemoryEngine().get_substitutes_for(
+            self.bad_product
+        )
+        self.assertEqual(substitutes, [self.good_product,
+                                       self.medium_product])
+
+    def test_memory_engine_returns_copies(self) -> None:
+        engine: MemoryEngine = MemoryEngine()
+        engine.get_substitutes_for(self.bad_product)[0].is_favorite = True
+        self.assertFalse(hasattr(
+            engine.get_substitutes_for(self.bad_product)[0], 'is_favorite'
+        ))
+
+    def test_memory_engine_no_query(self) -> None:
+        engine: MemoryEngine = MemoryEngine()
+        engine.warm_up()
+        with self.assertNumQueries(0):
+            product = engine.find_product('Bad Product')
+            engine.get_substitutes_for(product)  # type: ignore
+
+    def test_memory_engine_rebuilt_after_update(self) -> None:
+        engine: MemoryEngine = MemoryEngine()
+        engine.warm_up()
+        version: int = catalogue_version()
+        new_product: Product = Product.objects.create(
+            barcode='963852', name='New Product',
+            nutrition_grade='B', url='http://example5.com',
+        )
+        self.catego.products.add(new_product)
+        self.assertEqual(version, catalogue_version())  # Not committed yet
+        run_on_commit()
+        self.assertNotEqual(version, catalogue_version())
+        self.assertIn(new_product,
+                      engine.get_substitutes_for(self.bad_product))
+
+    def test_bump_catalogue_version(self) -> None:
+        version: int = catalogue_version()
+        bump_catalogue_version()
+        self.assertNotEqual(version, catalogue_version())
+
+    @override_settings(FOOD_SUBSTITUTE_ENGINE='Food.engines.MemoryEngine')
+    def test_get_engine(self) -> None:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            with override_settings(CACHES={'default': {
+                'BACKEND':
+                    'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': cache_dir,
+            }}):
+                self.assertIsInstance(get_engine(), MemoryEngine)
+                self.assertIs(get_engine(), get_engine())
+
+    @override_settings(FOOD_SUBSTITUTE_ENGINE='Food.engines.RankedEngine')
+    def test_get_engine_in_memory_needs_shared_cache(self) -> None:
+        with self.assertRaises(ImproperlyConfigured):
+            get_engine()
+
+    def test_warm_up_engine_in_background(self) -> None:
+        engine: SubstituteEngine = get_engine()
+        rebuilds: List[bool] = []
+        engine.rebuild_fuzzy_index_in_background = (  # type: ignore
+            lambda: rebuilds.append(True)
+        )
+        try:
+            warm_up_engine()
+        finally:
+            del engine.rebuild_fuzzy_index_in_background  # type: ignore
+        self.assertEqual([True], rebuilds)
+
+    def test_warm_up_engine_not_migrated(self) -> None:
+        engine: SubstituteEngine = get_engine()
+
+        def warm_up() -> None:
+            raise DatabaseError('no such table: Food_product')
+
+        engine.IN_MEMORY = True
+        engine.warm_up = warm_up  # type: ignore
+        try:
+            warm_up_engine()  # Doesn't raise
+        finally:
+            del engine.IN_MEMORY, engine.warm_up  # type: ignore
+
+
+class TestRankedEngine(TestCase):
+    def setUp(self) -> None:
+        self.catego: Category = Category.objects.create(name='Glaces')
+        self.searched: Product = self._create(
+            '1', 'Glace vanille chocolat', 'D'
+        )
+        self.similar: Product = self._create('2', 'Glace vanille', 'B')
+        self.unrelated: Product = self._create('3', 'Sorbet citron', 'B')
+        self.best: Product = self._create('4', 'Sorbet fraise', 'A')
+        self.worse: Product = self._create('5', 'Glace vanille noix', 'E')
+
+    def _create(self, barcode: str, name: str, grade: str) -> Product:
+        product: Product = Product.objects.create(
+            barcode=barcode, name=name, nutrition_grade=grade,
+            url=f'http://example{barcode}.com'
+        )
+        self.catego.products.add(product)
+        return product
+
+    def test_only_better_grades(self) -> None:
+        substitutes: List[Product] = RankedEngine().get_substitutes_for(
+            self.searched
+        )
+        self.assertEqual(set(substitutes),
+                         {self.similar, self.unrelated, self.best})
+
+    def test_similarity_ranking(self) -> None:
+        substitutes: List[Product] = RankedEngine().get_substitutes_for(
+            self.searched
+        )
+        self.assertLess(substitutes.index(self.similar),
+                        substitutes.index(self.unrelated))
+
+    def test_grade_ranking(self) -> None:
+        engine: RankedEngine = RankedEngine()
+        engine.GRADE_WEIGHT = 2.
+        substitutes: List[Product] = engine.get_substitutes_for(self.searched)
+        self.assertEqual(substitutes[0], self.best)
+
+    def test_ranking_cached_until_update(self) -> None:
+        engine: RankedEngine = RankedEngine()
+        engine.get_substitutes_for(self.searched)
+        self.assertIn(self.searched.pk, engine.rankings)
+        closest: Product = self._create('6', 'Glace vanille chocolat', 'B')
+        run_on_commit()
+        self.assertEqual(engine.get_substitutes_for(self.searched)[0],
+                         closest)
+
+    def test_rankings_bounded(self) -> None:
+        engine: RankedEngine = RankedEngine()
+        engine.MAX_RANKINGS = 2
+        engine.get_substitutes_for(self.searched)
+        engine.get_substitutes_for(self.best)
+        engine.get_substitutes_for(self.searched)  # Most recently used
+        engine.get_substitutes_for(self.unrelated)
+        self.assertEqual([self.searched.pk, self.unrelated.pk],
+                         list(engine.rankings))
+
+
+class TestText(TestCase):
+    def test_normalize(self) -> None:
+        self.assertEqual(normalize('  Crème   GLACÉE '), 'creme glacee')
+
+    def test_tokenize(self) -> None:
+        self.assertEqual(tokenize("Pâte à tartiner l'Été"),
+                         {'pate', 'tartiner', 'ete'})
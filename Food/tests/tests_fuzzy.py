@@ -0,0 +1,102 @@
+from typing import List
+from django.test import TestCase
+from Food.engines import MemoryEngine, OrmEngine
+from Food.fuzzy import FuzzyIndex, trigrams
+from Food.models import Product
+from Food.tests import run_on_commit
+
+
+class TestFuzzyIndex(TestCase):
+    def setUp(self) -> None:
+        self.names: List[str] = [
+            'Crème glacée vanille', 'Chips nature', 'Pizza 4 fromages',
+            'Chips au vinaigre', 'Chocolat noir 70%',
+        ]
+        self.index: FuzzyIndex = FuzzyIndex(self.names)
+
+    def test_trigrams(self) -> None:
+        self.assertEqual(trigrams('Été'), {'  e', ' et', 'ete', 'te '})
+
+    def test_exact_match(self) -> None:
+        self.assertEqual(self.index.best_match('Chips nature'),
+                         'Chips nature')
+
+    def test_typo_match(self) -> None:
+        self.assertEqual(self.index.best_match('chisp natrue'),
+                         'Chips nature')
+        self.assertEqual(self.index.best_match('creme glacee vanile'),
+                         'Crème glacée vanille')
+
+    def test_no_match(self) -> None:
+        self.assertIsNone(self.index.best_match('Haricots verts'))
+        self.assertIsNone(self.index.best_match(''))
+
+    def test_bounded_candidates(self) -> None:
+        index: FuzzyIndex = FuzzyIndex(
+            [f'Chips nature {i}' for i in range(200)]
+        )
+        index.MAX_CANDIDATES = 5
+        index.MAX_POSTINGS = 100
+        self.assertIsNotNone(index.best_match('Chips nature 150'))
+
+
+class TestEnginesFuzzyLookup(TestCase):
+    def setUp(self) -> None:
+        self.product: Product = Product.objects.create(
+            barcode='123456', name='Pizza 4 fromages',
+            nutrition_grade='C', url='http://example.com',
+        )
+
+    def test_find_similar_product(self) -> None:
+        for engine in (OrmEngine(), MemoryEngine()):
+            self.assertEqual(engine.find_similar_product('piza 4 fromage'),
+                             self.product)
+            self.assertIsNone(engine.find_similar_product('Glace'))
+
+    def test_index_built_by_warm_up(self) -> None:
+        engine: OrmEngine = OrmEngine()
+        engine.warm_up()
+        self.assertIsNotNone(engine.fuzzy_index)
+        with self.assertNumQueries(1):  # The lookup of the matched name
+            self.assertEqual(engine.find_similar_product('piza 4 fromage'),
+                             self.product)
+
+    def test_index_rebuilt_after_update(self) -> None:
+        engine: OrmEngine = OrmEngine()
+        engine.warm_up()
+        rebuilds: List[bool] = []
+        engine.rebuild_fuzzy_index_in_background = (  # type: ignore
+            lambda: rebuilds.append(True)
+        )
+        product: Product = Product.objects.create(
+            barcode='789123', name='Glace vanille',
+            nutrition_grade='B', url='http://example2.com',
+        )
+        run_on_commit()
+        # The previous index answers until its successor is built
+        self.assertIsNone(engine.find_similar_product('glace vanile'))
+        self.assertEqual([True], rebuilds)
+        engine.rebuild_fuzzy_index()
+        self.assertEqual(engine.find_similar_product('glace vanile'),
+                         product)
+
+    def test_rebuild_in_background(self) -> None:
+        engine: OrmEngine = OrmEngine()
+        rebuilds: List[bool] = []
+        engine.rebuild_fuzzy_index = (  # type: ignore
+            lambda: rebuilds.append(True)
+        )
+        engine.rebuild_fuzzy_index_in_background()
+        engine.fuzzy_thread.join()  # type: ignore
+        self.assertEqual([True], rebuilds)
+
+    def test_memory_engine_index_rebuilt_along(self) -> None:
+        engine: MemoryEngine = MemoryEngine()
+        engine.warm_up()
+        product: Product = Product.objects.create(
+            barcode='789123', name='Glace vanille',
+            nutrition_grade='B', url='http://example2.com',
+        )
+        run_on_commit()
+        self.assertEqual(engine.find_similar_product('glace vanile'),
+                         product)
@@ -0,0 +1,165 @@
+from typing import Any
+from unittest import skipIf
+import io
+import os
+import tempfile
+import time
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.test import override_settings, TestCase
+import responses  # type: ignore
+from Food import images
+from Food.models import Category, Product
+
+URL: str = 'https://static.openfoodfacts.org/images/products/1/front.full.jpg'
+requires_pillow: Any = skipIf(images.Image is None, 'Pillow is not installed')
+
+
+def image_bytes(width: int = 800, height: int = 600) -> bytes:
+    if images.Image is None:
+        return b'not an image'
+    output: io.BytesIO = io.BytesIO()
+    images.Image.new('RGB', (width, height), 'orange').save(output, 'PNG')
+    return output.getvalue()
+
+
+class TestImageCache(TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir: tempfile.TemporaryDirectory = \
+            tempfile.TemporaryDirectory()
+        self.settings_override: Any = override_settings(
+            FOOD_IMAGE_DIR=self.tmp_dir.name
+        )
+        self.settings_override.enable()
+
+    def tearDown(self) -> None:
+        self.settings_override.disable()
+        self.tmp_dir.cleanup()
+
+    def add_image(self, url: str = URL, status: int = 200) -> None:
+        responses.add(responses.GET, url, body=image_bytes(), status=status,
+                      content_type='image/png')
+
+    @requires_pillow
+    @responses.activate
+    def test_cache_image(self) -> None:
+        self.add_image()
+        self.assertTrue(images.cache_image(URL))
+        self.assertTrue(images.cache_image(URL))  # Not downloaded again
+        self.assertEqual(len(responses.calls), 1)
+        for size in (200, 400):
+            self.assertEqual(images.cached_variant(URL, size),
+                             f'{images.image_key(URL)}.jpg')
+        self.assertIsNone(images.cached_variant(URL, 100))
+
+    @requires_pillow
+    @responses.activate
+    def test_variants_resized(self) -> None:
+        self.add_image()
+        images.cache_image(URL)
+        path: str = images.variant_path(images.image_key(URL), 200)
+        with images.Image.open(path) as variant:
+            self.assertEqual(variant.format, 'JPEG')
+            self.assertEqual(variant.size, (200, 150))
+
+    @responses.activate
+    def test_nothing_cached_without_pillow(self) -> None:
+        self.add_image()
+        pillow: Any = images.Image
+        images.Image = None
+        try:
+            self.assertFalse(images.cache_image(URL))
+        finally:
+            images.Image = pillow
+        self.assertEqual(len(responses.calls), 0)
+        self.assertEqual([], os.listdir(self.tmp_dir.name))
+
+    @responses.activate
+    def test_cache_image_failure(self) -> None:
+        self.add_image(status=404)
+        self.assertFalse(images.cache_image(URL))
+        self.assertIsNone(images.cached_variant(URL, 200))
+
+    @requires_pillow
+    @responses.activate
+    def test_cache_product_images(self) -> None:
+        nutrition_url: str = URL.replace('front', 'nutrition')
+        self.add_image()
+        self.add_image(nutrition_url)
+        Product.objects.create(barcode='1', name='Nutella', url='u1',
+                               img=URL, nutrition_img=nutrition_url)
+        Product.objects.create(barcode='2', name='Pâte', url='u2', img=URL)
+        self.assertEqual(images.cache_product_images(2), (2, 0))
+
+    def test_evict_least_recently_served(self) -> None:
+        now: float = time.time()
+        paths = [images.variant_path(f'{i}' * 40, 200) for i in range(4)]
+        for age, path in enumerate(reversed(paths)):
+            images._write(path, b'x' * 100)
+            os.utime(path, (now - age * 3600, now - age * 3600))
+        self.assertEqual(images.evict(1000), 0)
+        self.assertEqual(images.evict(300), 2)
+        self.assertEqual([os.path.exists(path) for path in paths],
+                         [False, False, True, True])
+
+    @requires_pillow
+    @responses.activate
+    def test_image_view(self) -> None:
+        self.add_image()
+        images.cache_image(URL)
+        name: str = images.cached_variant(URL, 400)  # type: ignore
+        response: HttpResponse = self.client.get(f'/food/img/400/{name}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertIn('immutable', response['Cache-Control'])
+        response.close()
+        for url in (f'/food/img/100/{name}', '/food/img/400/../x.jpg',
+                    f'/food/img/400/{"0" * 40}.jpg'):
+            self.assertEqual(self.client.get(url).status_code, 404)
+
+    @requires_pillow
+    @responses.activate
+    def test_resize_img_filter(self) -> None:
+        template: Template = Template(
+            '{% load food_resize_img %}{{ url|resize_img:200 }}'
+        )
+        self.assertEqual(template.render(Context({'url': URL})),
+                         URL.replace('.full.', '.200.'))
+        self.add_image()
+        images.cache_image(URL)
+        self.assertEqual(template.render(Context({'url': URL})),
+                         f'/food/img/200/{images.image_key(URL)}.jpg')
+
+    @requires_pillow
+    @responses.activate
+    def test_generation(self) -> None:
+        self.add_image()
+        self.assertEqual(0, images.generation())
+        images.cache_images([URL])
+        generation: int = images.generation()
+        self.assertNotEqual(0, generation)
+        self.assertEqual(images.evict(0), 2)  # The variants only
+        self.assertNotEqual(generation, images.generation())
+
+    @requires_pillow
+    @responses.activate
+    def test_cached_card_follows_eviction(self) -> None:
+        self.add_image()
+        bad: Product = Product.objects.create(
+            barcode='1', name='Bad', url='http://b.fr', nutrition_grade='E'
+        )
+        good: Product = Product.objects.create(
+            barcode='2', name='Good', url='http://g.fr', nutrition_grade='A',
+            img=URL
+        )
+        Category.objects.create(name='Category').products.add(bad, good)
+        images.cache_image(URL)
+        variant: str = f'/food/img/400/{images.image_key(URL)}.jpg'
+        response: HttpResponse = self.client.post('/food/search', {
+            'food_search': 'Bad'
+        })
+        self.assertContains(response, variant)
+        images.evict(0)
+        response = self.client.post('/food/search', {'food_search': 'Bad'})
+        self.assertNotContains(response, variant)
+        self.assertContains(response, URL.replace('.full.', '.400.'))
@@ -44,6 +44,38 @@ class TestProductModel(TestCase):
         )
         self.assertIn(top_product, substitutes)
 
+    def test_search_name(self) -> None:
+        product: Product = Product.objects.create(**dict(
+            self.data, name='  Crème   GLACÉE vanille'
+        ))
+        self.assertEqual(product.search_name, 'creme glacee vanille')
+        product.name = 'Sorbet Citron'
+        product.save()
+        self.assertEqual(Product.objects.get(pk=product.pk).search_name,
+                         'sorbet citron')
+
+    def test_starting_with(self) -> None:
+        product: Product = Product.objects.create(**dict(
+            self.data, name='Crème glacée vanille'
+        ))
+        Product.objects.create(**self.data2)
+        self.assertEqual(list(Product.starting_with('CREME gla')), [product])
+        self.assertEqual(len(Product.starting_with('')), 2)
+        self.assertEqual(len(Product.starting_with('glacee')), 0)
+
+    def test_starting_with_range_on_sqlite(self) -> None:
+        sql: str = str(Product.starting_with('creme').query)
+        self.assertIn('"search_name" < ', sql)
+        self.assertNotIn('LIKE', sql)
+
+    def test_fingerprint(self) -> None:
+        product: Product = Product.objects.create(**self.data)
+        fingerprint: str = product.fingerprint
+        self.assertEqual(fingerprint,
+                         Product.objects.first().fingerprint)  # type: ignore
+        product.nutrition_grade = 'B'
+        self.assertNotEqual(fingerprint, product.fingerprint)
+
     def test_delete_all(self) -> None:
         for data in (self.data, self.data2):
             Product.objects.create(**data)
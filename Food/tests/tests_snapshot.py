@@ -0,0 +1,195 @@
+from contextlib import redirect_stdout
+from typing import Any, Dict, List
+import array
+import io
+import os
+import tempfile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError
+from django.test import TestCase
+from Food.engines import catalogue_version
+from Food.models import Category, Product
+from Food.snapshot import (export_snapshot, load_snapshot, read_npy,
+                           restore_snapshot, StringColumn, write_npy)
+from Food.tests import run_on_commit
+
+
+class TestSnapshot(TestCase):
+    def setUp(self) -> None:
+        self.products: List[Product] = [
+            Product.objects.create(
+                barcode=f'{i}23456', name=f'Prodüct {i} crème',
+                nutrition_grade='ABCDE'[i % 5], url=f'http://example{i}.com',
+                img='' if i % 2 else f'http://img{i}.com'
+            ) for i in range(7)
+        ]
+        self.catego: Category = Category.objects.create(name='Glaces')
+        self.catego.products.add(*self.products[:4])
+        Category.objects.create(name='Chips').products.add(
+            *self.products[3:]
+        )
+        self.tmp_dir: tempfile.TemporaryDirectory = \
+            tempfile.TemporaryDirectory()
+        self.directory: str = os.path.join(self.tmp_dir.name, 'snap')
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_npy_round_trip(self) -> None:
+        path: str = os.path.join(self.tmp_dir.name, 'values.npy')
+        for typecode in ('q', 'B'):
+            values: array.array = array.array(typecode, [0, 3, 255, 7])
+            write_npy(path, values)
+            with open(path, 'rb') as npy_file:
+                header_len: int = int.from_bytes(npy_file.read(10)[8:],
+                                                 'little')
+            self.assertEqual(0, (10 + header_len) % 64)
+            self.assertEqual(values, read_npy(path))
+
+    def test_string_column(self) -> None:
+        column: StringColumn = StringColumn(array.array('q', [0, 3, 3, 9]),
+                                            'abcdéfgh'.encode('utf-8'))
+        self.assertEqual(['abc', '', 'défgh'], list(column))
+        self.assertEqual('défgh', column[-1])
+        with self.assertRaises(IndexError):
+            column[3]
+
+    def test_export_and_load(self) -> None:
+        manifest: Dict[str, Any] = export_snapshot(self.directory,
+                                                   batch_size=2)
+        self.assertEqual(7, manifest['tables']['products']['rows'])
+        self.assertEqual(2, manifest['tables']['categories']['rows'])
+        self.assertEqual(8,
+                         manifest['tables']['product_categories']['rows'])
+        snapshot: Any = load_snapshot(self.directory, use_numpy=False)
+        products: Dict[str, Any] = snapshot.products
+        ordered: List[Product] = sorted(self.products, key=lambda p: p.pk)
+        self.assertEqual([p.pk for p in ordered], list(products['id']))
+        for field in ('barcode', 'name', 'url', 'img', 'nutrition_img'):
+            self.assertEqual([getattr(p, field) for p in ordered],
+                             list(products[field]))
+        labels: List[str] = \
+            snapshot.manifest['tables']['products']['columns'][
+                'nutrition_grade']['labels']
+        self.assertEqual([p.nutrition_grade for p in ordered],
+                         [labels[g] for g in products['nutrition_grade']])
+        self.assertEqual(['Glaces', 'Chips'],
+                         list(snapshot.categories['name']))
+        links: Dict[str, Any] = snapshot.product_categories
+        self.assertEqual(
+            sorted((c.pk, p.pk) for c in Category.objects.all()
+                   for p in c.products.all()),
+            list(zip(links['category_id'], links['product_id']))
+        )
+
+    def test_export_unknown_grade(self) -> None:
+        Product.objects.filter(pk=self.products[0].pk).update(
+            nutrition_grade=''
+        )
+        Product.objects.filter(pk=self.products[1].pk).update(
+            nutrition_grade='F'
+        )
+        manifest: Dict[str, Any] = export_snapshot(self.directory)
+        unknown: int = manifest['tables']['products']['columns'][
+            'nutrition_grade']['unknown']
+        grades: List[int] = list(
+            load_snapshot(self.directory, use_numpy=False).products[
+                'nutrition_grade']
+        )
+        self.assertEqual([unknown, unknown, 2], grades[:3])
+
+    def test_export_replaces_snapshot(self) -> None:
+        export_snapshot(self.directory)
+        Product.objects.filter(pk=self.products[0].pk).delete()
+        export_snapshot(self.directory)
+        self.assertEqual(
+            6, len(load_snapshot(self.directory).products['barcode'])
+        )
+        self.assertEqual(['snap'], os.listdir(self.tmp_dir.name))
+
+    def test_command(self) -> None:
+        out: io.StringIO = io.StringIO()
+        with redirect_stdout(out):
+            call_command('export_food_snapshot', output=self.directory)
+        self.assertIn('products: 7', out.getvalue())
+        self.assertTrue(os.path.isfile(
+            os.path.join(self.directory, 'manifest.json')
+        ))
+
+
+class TestRestoreSnapshot(TestCase):
+    def setUp(self) -> None:
+        self.products: List[Product] = [
+            Product.objects.create(
+                barcode=f'{i}65432', name=f'Pizzä {i}',
+                nutrition_grade='ABCDE'[i % 5], url=f'http://pizza{i}.com',
+                nutrition_img=f'http://nutrition{i}.com'
+            ) for i in range(5)
+        ]
+        Category.objects.create(name='Pizzas').products.add(*self.products)
+        self.tmp_dir: tempfile.TemporaryDirectory = \
+            tempfile.TemporaryDirectory()
+        self.directory: str = os.path.join(self.tmp_dir.name, 'snap')
+        export_snapshot(self.directory)
+        self.rows: List[Any] = list(Product.objects.values_list())
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_restore(self) -> None:
+        Category.delete_all()
+        Product.delete_all()
+        version: int = catalogue_version()
+        self.assertEqual(
+            {'products': 5, 'categories': 1, 'product_categories': 5},
+            restore_snapshot(self.directory)
+        )
+        self.assertEqual(self.rows, list(Product.objects.values_list()))
+        self.assertEqual(5, Category.objects.get(name='Pizzas')
+                         .products.count())
+        self.assertEqual('pizza 0', Product.objects.first().search_name)
+        self.assertEqual(version, catalogue_version())  # Not committed yet
+        run_on_commit()
+        self.assertNotEqual(version, catalogue_version())
+        new: Product = Product.objects.create(
+            barcode='999', name='New', nutrition_grade='A', url='http://n.fr'
+        )
+        self.assertGreater(new.pk, max(p.pk for p in self.products))
+
+    def test_restore_not_empty(self) -> None:
+        with self.assertRaises(ValueError):
+            restore_snapshot(self.directory)
+        Product.objects.filter(pk=self.products[0].pk).update(name='Other')
+        restore_snapshot(self.directory, replace=True)
+        self.assertEqual(self.rows, list(Product.objects.values_list()))
+
+    def test_restore_in_one_transaction(self) -> None:
+        with open(os.path.join(self.directory,
+                               'categories.name.offsets.npy'), 'wb'):
+            pass
+        with self.assertRaises(ValueError):
+            restore_snapshot(self.directory, replace=True)
+        self.assertEqual(self.rows, list(Product.objects.values_list()))
+
+    def test_restore_dangling_link(self) -> None:
+        path: str = os.path.join(self.directory,
+                                 'product_categories.product_id.npy')
+        product_ids: array.array = read_npy(path)
+        product_ids[0] = max(p.pk for p in self.products) + 1
+        write_npy(path, product_ids)
+        with self.assertRaises(IntegrityError):
+            restore_snapshot(self.directory, replace=True)
+        self.assertEqual(self.rows, list(Product.objects.values_list()))
+
+    def test_command(self) -> None:
+        out: io.StringIO = io.StringIO()
+        with redirect_stdout(out):
+            call_command('load_food_snapshot', self.directory, if_empty=True)
+            call_command('load_food_snapshot', self.directory, replace=True)
+        self.assertIn('nothing to do', out.getvalue())
+        self.assertIn('products: 5', out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('load_food_snapshot', self.directory)
+        with self.assertRaises(CommandError):
+            call_command('load_food_snapshot', self.tmp_dir.name)
@@ -0,0 +1,98 @@
+from typing import List
+import tempfile
+from django.test import override_settings, TestCase
+from django.urls import reverse
+from Food.engines import bump_catalogue_version, catalogue_version
+from Food.models import Category, Product
+from Food.stats import (category_histogram, grade_histograms,
+                        nb_better_products)
+from Food.tests import run_on_commit
+from User.models import User
+
+
+class TestStats(TestCase):
+    def setUp(self) -> None:
+        self.products: List[Product] = [
+            Product.objects.create(
+                barcode=f'{i}11', name=f'Product {i}', url=f'http://p{i}.fr',
+                nutrition_grade=grade
+            ) for i, grade in enumerate('ABBCEE')
+        ]
+        self.catego: Category = Category.objects.create(name='Category 1')
+        self.catego.products.add(*self.products[:4])
+        self.other: Category = Category.objects.create(name='Category 2')
+        self.other.products.add(*self.products[4:])
+        run_on_commit()
+
+    def test_grade_histograms(self) -> None:
+        self.assertEqual(grade_histograms(), {
+            self.catego.pk: {'A': 1, 'B': 2, 'C': 1},
+            self.other.pk: {'E': 2},
+        })
+        self.assertEqual({}, category_histogram(0))
+
+    def test_single_query_then_memoized(self) -> None:
+        catalogue_version()  # Version fetched by each call, from the cache
+        with self.assertNumQueries(1):
+            grade_histograms()
+        with self.assertNumQueries(0):
+            grade_histograms()
+            category_histogram(self.catego.pk)
+
+    def test_refreshed_after_catalogue_change(self) -> None:
+        grade_histograms()
+        self.other.products.add(self.products[0])
+        run_on_commit()
+        self.assertEqual({'A': 1, 'E': 2}, category_histogram(self.other.pk))
+        self.products[1].nutrition_grade = 'A'
+        self.products[1].save()
+        run_on_commit()
+        self.assertEqual({'A': 2, 'B': 1, 'C': 1},
+                         category_histogram(self.catego.pk))
+
+    def test_nb_better_products(self) -> None:
+        self.assertEqual(0, nb_better_products(self.catego.pk, 'A'))
+        self.assertEqual(3, nb_better_products(self.catego.pk, 'C'))
+        self.assertEqual(0, nb_better_products(self.other.pk, 'E'))
+
+    def test_get_substitutes_for_short_circuit(self) -> None:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            with override_settings(CACHES={'default': {
+                'BACKEND':
+                    'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': cache_dir,
+            }}):
+                bump_catalogue_version()  # Version 1 in the new cache
+                grade_histograms()
+                with self.assertNumQueries(1):  # The category of the product
+                    self.assertEqual([], list(
+                        Product.get_substitutes_for(self.products[4])
+                    ))
+                self.assertCountEqual(
+                    self.products[:3],
+                    Product.get_substitutes_for(self.products[3])
+                )
+
+    def test_get_substitutes_for_no_short_circuit_per_process(self) -> None:
+        grade_histograms()
+        with self.assertNumQueries(2):  # The histograms may be stale
+            self.assertEqual([], list(
+                Product.get_substitutes_for(self.products[4])
+            ))
+
+    def test_get_substitutes_for_no_category(self) -> None:
+        orphan: Product = Product.objects.create(
+            barcode='999', name='Orphan', url='http://o.fr',
+            nutrition_grade='E'
+        )
+        self.assertEqual([], list(Product.get_substitutes_for(orphan)))
+
+    def test_admin_histogram(self) -> None:
+        admin: User = User.objects.create_user(email='admin@pb.fr',
+                                               password='admin')
+        admin.is_staff = admin.is_superuser = True
+        admin.save()
+        self.client.force_login(admin)
+        response = self.client.get(reverse('admin:Food_category_changelist'))
+        self.assertContains(response, 'A: 1 | B: 2 | C: 1 | D: 0 | E: 0')
+        self.assertContains(response, 'A: 0 | B: 0 | C: 0 | D: 0 | E: 2')
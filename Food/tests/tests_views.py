@@ -4,6 +4,7 @@ from django.db.models.query import QuerySet
 from django.http import HttpResponse
 from django.test import Client, TestCase
 from Food.models import Category, Product
+from Food.views import AjaxView
 
 
 class TestSearchView(TestCase):
@@ -35,6 +36,35 @@ class TestSearchView(TestCase):
         })
         self.assertContains(response, self.good_product.name)
 
+    def test_cached_card_follows_updates(self) -> None:
+        self.client.post(self.URL, {'food_search': 'Bad Product'})
+        self.good_product.name = 'Better Product'
+        self.good_product.save()
+        response: HttpResponse = self.client.post(self.URL, {
+            'food_search': 'Bad Product'
+        })
+        self.assertContains(response, 'Better Product')
+
+    def test_search_without_accents(self) -> None:
+        self.bad_product.name = 'Crème glacée'
+        self.bad_product.save()
+        response: HttpResponse = self.client.post(self.URL, {
+            'food_search': 'creme glacee'
+        })
+        self.assertContains(response, self.good_product.name)
+
+    def test_search_name_beginning(self) -> None:
+        response: HttpResponse = self.client.post(self.URL, {
+            'food_search': 'bad'
+        })
+        self.assertContains(response, self.good_product.name)
+
+    def test_search_with_typo(self) -> None:
+        response: HttpResponse = self.client.post(self.URL, {
+            'food_search': 'bad prodcut'
+        })
+        self.assertContains(response, self.good_product.name)
+
 
 class TestProductView(TestCase):
     def setUp(self) -> None:
@@ -54,3 +84,34 @@ class TestProductView(TestCase):
             f'{self.good_product.barcode}/{self.bad_product.barcode}'
         )
         self.assertTemplateUsed(response, 'Food/details.html')
+
+
+class TestAjaxView(TestCase):
+    URL: str = '/food/ajax'
+
+    def setUp(self) -> None:
+        self.client: Client = Client()
+        for barcode, name in (('1', 'Crème glacée vanille'),
+                              ('2', 'Crème brûlée'),
+                              ('3', 'Glace chocolat')):
+            Product.objects.create(barcode=barcode, name=name,
+                                   nutrition_grade='C',
+                                   url=f'http://example{barcode}.com')
+
+    def test_prefix_without_accents(self) -> None:
+        response: HttpResponse = self.client.get(self.URL, {'term': 'creme'})
+        self.assertEqual(json.loads(response.content.decode('utf-8')), {
+            'results': ['Crème brûlée', 'Crème glacée vanille'],
+            'complete': True,
+        })
+
+    def test_incomplete_results(self) -> None:
+        for i in range(AjaxView.MAX_RESULTS):
+            Product.objects.create(barcode=f'1{i}', name=f'Glace {i}',
+                                   nutrition_grade='C',
+                                   url=f'http://example1{i}.com')
+        data: Dict[str, Any] = json.loads(self.client.get(
+            self.URL, {'term': 'glace'}
+        ).content.decode('utf-8'))
+        self.assertEqual(len(data['results']), AjaxView.MAX_RESULTS)
+        self.assertFalse(data['complete'])
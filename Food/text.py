@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+'''Text helpers used to compare product names'''
+from typing import FrozenSet
+import re
+import unicodedata
+
+
+WORD_RE = re.compile(r'\w\w+')
+
+
+def normalize(text: str) -> str:
+    '''Lowercase the text, strip its accents and collapse its whitespaces'''
+    decomposed: str = unicodedata.normalize('NFKD', text)
+    stripped: str = ''.join(
+        char for char in decomposed if not unicodedata.combining(char)
+    )
+    return ' '.join(stripped.lower().split())
+
+
+def tokenize(text: str) -> FrozenSet[str]:
+    '''Set of the normalized words (2 characters or more) of the text'''
+    return frozenset(WORD_RE.findall(normalize(text)))
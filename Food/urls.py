@@ -12,4 +12,6 @@ urlpatterns: List[path] = [
     path(_('product/<int:substitute_barcode>/<int:substituted_barcode>'),
          views.ProductView.as_view(), name=_('product')),
     path(_('ajax'), views.AjaxView.as_view(), name=_('ajax')),
+    path('img/<int:size>/<str:name>', views.ImageView.as_view(),
+         name='image'),
 ]
@@ -1,8 +1,11 @@
 from typing import List, Optional, Tuple
 from django.db.models.query import QuerySet
-from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.http import (FileResponse, Http404, HttpRequest, HttpResponse,
+                         JsonResponse)
 from django.shortcuts import render
 from django.views.generic import View
+from Food.engines import get_engine, SubstituteEngine
+from Food import images
 from Food.models import Product
 from User.models import User
 from Favorite.models import Favorite
@@ -18,15 +21,21 @@ class SearchView(View):
             substituted, substitutes = self.substitute_product(
                 request.user, search
             )
+        image_generation: int = images.generation()  # Keys the cached cards
         return render(request, self.products_list_template, locals())
 
-    def _find_product(self, product_name: str) -> Optional[Product]:  # type: ignore # noqa
-        products: QuerySet = Product.objects.filter(name=product_name)
-        if products:
-            return products.first()  # Should only exist ONE product w/ this name # noqa
+    def _find_product(self, product_name: str) -> Optional[Product]:
+        # Should only exist ONE product w/ this name
+        engine: SubstituteEngine = get_engine()
+        product: Optional[Product] = engine.find_product(product_name)
+        if product is None:  # Beginning of a product name?
+            product = engine.find_product_starting_with(product_name)
+        if product is None:  # Typo in the search?
+            product = engine.find_similar_product(product_name)
+        return product
 
-    def _find_substitutes(self, product: Product) -> QuerySet:
-        return Product.get_substitutes_for(product).all()
+    def _find_substitutes(self, product: Product) -> List[Product]:
+        return get_engine().get_substitutes_for(product)
 
     def substitute_product(
         self, user: User, search: Optional[str]
@@ -46,7 +55,7 @@ class SearchView(View):
                             substitute.is_favorite = False
                         substitutes.append(substitute)
                 else:
-                    substitutes = list(self._find_substitutes(product))
+                    substitutes = self._find_substitutes(product)
         return (product, substitutes)
 
 
@@ -73,9 +82,35 @@ class ProductView(View):
 
 
 class AjaxView(View):
+    '''Names of the products starting w/ the term (autocomplete). The
+    results are complete if no other product starts w/ the term, so that
+    the client can filter them for the longer terms'''
+    MAX_RESULTS: int = 15
+
     def get(self, request: HttpRequest) -> HttpResponse:
-        results: List[str] = []
         query: str = request.GET.get('term', '')
-        for r in Product.objects.filter(name__icontains=query)[:15]:
-            results.append(r.name)
-        return JsonResponse(results, safe=False)
+        results: List[str] = list(Product.starting_with(query).values_list(
+            'name', flat=True
+        )[:self.MAX_RESULTS + 1])
+        return JsonResponse({
+            'results': results[:self.MAX_RESULTS],
+            'complete': len(results) <= self.MAX_RESULTS,
+        })
+
+
+class ImageView(View):
+    '''Serve a variant of a product image from the local cache
+    (Food.images), the URL of a variant being immutable'''
+    def get(self, request: HttpRequest, size: int, name: str) -> HttpResponse:
+        if size not in images.image_sizes() or \
+                not images.IMAGE_NAME.match(name):
+            raise Http404
+        path: str = images.variant_path(name[:-len('.jpg')], size)
+        try:
+            response: HttpResponse = FileResponse(open(path, 'rb'),
+                                                  content_type='image/jpeg')
+        except FileNotFoundError:
+            raise Http404
+        images.touch(path)
+        response['Cache-Control'] = 'public, max-age=31536000, immutable'
+        return response
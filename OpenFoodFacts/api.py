@@ -2,8 +2,9 @@
 '''Class interfacing the App and the OpenFoodFacts's API
 @note   Copied and modified version of my OCP5 repo:
         https://github.com/SebDeclercq/OC_Projet_5/tree/master/OpenFoodFacts'''
-from typing import Any, Dict, Iterator, List, Set, Union
+from typing import Any, Dict, Iterator, List, Set, Tuple, Union
 from dataclasses import dataclass, fields
+import math
 import re
 import requests
 
@@ -43,8 +44,12 @@ class API:
     Class attributes:
         BASE_URL:      URL to the API without parameter
         BASE_PARAMS:   Dictionary containing base parameters for the API
+                       (w/ the fields of the products to be sent back)
         USEFUL_FIELDS: Collects dynamically the Product attributes names.
-                       Simplifies the collection of the wanted data only.'''
+                       Simplifies the collection of the wanted data only.
+        MIN_PAGE_SIZE, MAX_PAGE_SIZE: Bounds of the adaptive page size
+        OVERFETCH:     Margin of the adaptive page size over the number
+                       of products expected to be complete'''
     BASE_URL: str = 'https://fr.openfoodfacts.org/cgi/search.pl'
     BASE_PARAMS: Dict[str, Union[int, str]] = {
         'action': 'process',
@@ -53,10 +58,19 @@ class API:
         'sort_by': 'unique_scans_n',
         'tagtype_0': 'categories',
         'tag_contains_0': 'contains',
+        'fields': ('id,product_name,nutrition_grades,url,image_url,'
+                   'image_nutrition_small_url'),
     }
     USEFUL_FIELDS: Set[str] = {
         field.name for field in fields(Product)
     }
+    MIN_PAGE_SIZE: int = 20
+    MAX_PAGE_SIZE: int = 1000
+    OVERFETCH: float = 1.1
+
+    def __init__(self) -> None:
+        # Number of products received and of complete ones, by category
+        self.completeness_stats: Dict[str, List[int]] = {}
 
     def _get_products(
         self, params: Dict[str, Union[int, str]]
@@ -64,15 +78,34 @@ class API:
         '''Private method calling the API with the parameters provided.
         Instanciates a Product object for every products collected in
         the API response and yields them'''
+        yield from self._parse_products(self._request(params),
+                                        str(params.get('tag_0', '')))
+
+    def _request(
+        self, params: Dict[str, Union[int, str]]
+    ) -> Dict[str, Any]:
+        '''Private method calling the API with the parameters provided
+        (added to the base ones) and returning the decoded response'''
         r_params: Dict[str, Union[int, str]] = self.BASE_PARAMS.copy()
         r_params.update(params)
         r_result: requests.Response = requests.get(self.BASE_URL, r_params)
         if r_result.status_code != requests.codes.ok:
             r_result.raise_for_status()
-        products: List[Dict[str, Any]] = r_result.json()['products']
+        return r_result.json()
+
+    def _parse_products(self, response: Dict[str, Any],
+                        category: str = '') -> Iterator[Product]:
+        '''Private method instanciating a Product object for every
+        complete product of the API response (counted in the
+        completeness stats of the category)'''
+        products: List[Dict[str, Any]] = response['products']
+        stats: List[int] = self.completeness_stats.setdefault(category,
+                                                              [0, 0])
         for result in products:
-            result['name'] = result.pop('product_name')
+            stats[0] += 1
+            result['name'] = result.pop('product_name', '')
             if self._result_complete(result):  # If all data are available
+                stats[1] += 1
                 product: Product = Product(
                     **{k: result[k] for k in self.USEFUL_FIELDS}
                 )
@@ -96,3 +129,45 @@ class API:
             'page': page,
             'page_size': page_size,
         })
+
+    def completeness(self, category: str) -> float:
+        '''Ratio of complete products received so far for the category
+        (1 if none was received yet)'''
+        received, complete = self.completeness_stats.get(category, (0, 0))
+        return complete / received if received else 1.
+
+    def page_size_for(self, category: str, nb_products: int,
+                      offset: int = 0) -> int:
+        '''Size of the page expected to hold nb_products complete products
+        given the completeness of the category, and such that a page
+        starts at the offset (a divisor of the offset, so that no product
+        is received twice)'''
+        size: int = round(nb_products * self.OVERFETCH
+                          / max(self.completeness(category), .05))
+        size = min(max(size, self.MIN_PAGE_SIZE), self.MAX_PAGE_SIZE)
+        if not offset:
+            return size
+        divisors: Set[int] = set()
+        for i in range(1, int(math.sqrt(offset)) + 1):
+            if offset % i == 0:
+                divisors.update((i, offset // i))
+        larger: List[int] = [d for d in divisors
+                             if size <= d <= self.MAX_PAGE_SIZE]
+        return min(larger) if larger else max(d for d in divisors
+                                              if d <= size)
+
+    def search_from(self, category: str, offset: int,
+                    nb_products: int) -> Tuple[List[Product], int]:
+        '''Public method querying the products of the category from the
+        offset one, w/ a page size adapted to get about nb_products
+        complete Products. Returns them along w/ the number of products
+        received (0 when there is no more products)'''
+        page_size: int = self.page_size_for(category, nb_products, offset)
+        response: Dict[str, Any] = self._request({
+            'tag_0': category,
+            'page': offset // page_size + 1,
+            'page_size': page_size,
+        })
+        products: List[Product] = list(self._parse_products(response,
+                                                            category))
+        return (products, len(response['products']))
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+'''Asynchronous counterpart of the API class, fetching pages of the
+OpenFoodFacts's API concurrently (within the limits of the OFF usage
+policy)'''
+from itertools import count
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+import asyncio
+import math
+import time
+from OpenFoodFacts.api import API, Product
+
+
+class RateLimiter:
+    '''Token bucket: up to burst requests at once, then rate requests
+    by second on average'''
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self.rate: float = rate
+        self.burst: int = burst
+        self.tokens: float = burst
+        self.updated: float = time.monotonic()
+
+    async def acquire(self) -> None:
+        '''Wait until a request can be sent'''
+        while True:
+            now: float = time.monotonic()
+            self.tokens = min(self.burst,
+                              self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncAPI(API):
+    '''Class interfacing the App and the OpenFoodFacts's API w/ asyncio.
+    The requests are sent by the default executor of the event loop (at
+    most max_concurrency at once) and limited to requests_per_minute.
+    Class attributes:
+        REQUESTS_PER_MINUTE: Rate of search queries allowed by the OFF
+                             usage policy'''
+    REQUESTS_PER_MINUTE: float = 10
+
+    def __init__(self, max_concurrency: int = 4,
+                 requests_per_minute: Optional[float] = None) -> None:
+        super().__init__()
+        self.max_concurrency: int = max_concurrency
+        self.requests_per_minute: float = (requests_per_minute
+                                           or self.REQUESTS_PER_MINUTE)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._limiter: Optional[RateLimiter] = None
+
+    def _init_limits(self) -> None:
+        '''The semaphore has to be created within the running loop (once
+        by loop, each asyncio.run starting a new one)'''
+        if self._loop is not asyncio.get_event_loop():
+            self._loop = asyncio.get_event_loop()
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._limiter = RateLimiter(self.requests_per_minute / 60,
+                                        self.max_concurrency)
+
+    async def _async_request(
+        self, params: Dict[str, Union[int, str]]
+    ) -> Dict[str, Any]:
+        '''Private method calling the API w/o blocking the event loop'''
+        self._init_limits()
+        async with self._semaphore:  # type: ignore
+            await self._limiter.acquire()  # type: ignore
+            return await self._loop.run_in_executor(  # type: ignore
+                None, self._request, params
+            )
+
+    async def _fetch_page(
+        self, category: str, page: int, page_size: int
+    ) -> Tuple[List[Product], int]:
+        '''Private method returning the complete Products of the page and
+        the total number of products of the category'''
+        response: Dict[str, Any] = await self._async_request({
+            'tag_0': category,
+            'page': page,
+            'page_size': page_size,
+        })
+        return (list(self._parse_products(response, category)),
+                int(response.get('count', 0)))
+
+    async def search(
+        self, category: str, page: int = 1, page_size: int = 20
+    ) -> AsyncIterator[Product]:
+        '''Public method to query the API based on
+        a category id. Yields associated Products'''
+        products, __ = await self._fetch_page(category, page, page_size)
+        for product in products:
+            yield product
+
+    async def collect(self, category: str, nb_products: int,
+                      page_size: int = 20) -> List[Product]:
+        '''Public method collecting the first nb_products complete Products
+        of the category (in the order of the API), fetching the next
+        pages concurrently. The pending requests are cancelled as soon as
+        enough products are collected'''
+        products: List[Product] = []
+        pending: Dict[int, asyncio.Future] = {}
+        next_page: int = 1
+        last_page: Optional[int] = None
+        try:
+            for page in count(1):
+                while len(pending) < self.max_concurrency and \
+                        (last_page is None or next_page <= last_page):
+                    pending[next_page] = asyncio.ensure_future(
+                        self._fetch_page(category, next_page, page_size)
+                    )
+                    next_page += 1
+                if page not in pending:  # No more pages
+                    break
+                page_products, nb_results = await pending.pop(page)
+                last_page = math.ceil(nb_results / page_size)
+                products.extend(page_products)
+                if len(products) >= nb_products:
+                    break
+        finally:
+            for future in pending.values():
+                future.cancel()
+            await asyncio.gather(*pending.values(), return_exceptions=True)
+        return products[:nb_products]
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+'''Parsing of the OFF CSV file by chunks, in worker processes.
+This module doesn't depend on Django, so that the workers can be spawned
+without setting up the project'''
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+import csv
+import io
+import os
+
+
+_known_barcodes: FrozenSet[str] = frozenset()
+
+
+def read_header(path: str, separator: str) -> Tuple[List[str], int]:
+    '''Return the column names of the CSV file and the offset of its
+    first data line'''
+    with open(path, 'rb') as csv_file:
+        header: bytes = csv_file.readline()
+        return (next(csv.reader([header.decode('utf-8').rstrip('\r\n')],
+                                delimiter=separator)),
+                csv_file.tell())
+
+
+def split_chunks(path: str, start: int,
+                 chunk_size: int) -> List[Tuple[int, int]]:
+    '''Split the file from start to its end in (start, end) byte ranges of
+    about chunk_size bytes, each one ending at a line boundary.
+    NB: the OFF dump has no line break within its fields, which is what
+    makes splitting it at line boundaries safe'''
+    size: int = os.path.getsize(path)
+    chunks: List[Tuple[int, int]] = []
+    with open(path, 'rb') as csv_file:
+        while start < size:
+            csv_file.seek(min(start + chunk_size, size))
+            csv_file.readline()  # Move to the end of the current line
+            end: int = min(csv_file.tell(), size)
+            chunks.append((start, end))
+            start = end
+    return chunks
+
+
+def init_worker(known_barcodes: Iterable[str]) -> None:
+    '''Pool initializer: share the barcodes to match once by worker'''
+    global _known_barcodes
+    _known_barcodes = frozenset(known_barcodes)
+
+
+def parse_chunk(
+    path: str, start: int, end: int, separator: str, header: List[str],
+    useful_keys: Iterable[str], known_barcodes: Optional[FrozenSet[str]] = None
+) -> List[Tuple[str, Dict[str, str]]]:
+    '''Parse the byte range of the CSV file and return (barcode, fields)
+    for the rows whose barcode is known, with the useful fields only'''
+    barcodes: FrozenSet[str] = (known_barcodes if known_barcodes is not None
+                                else _known_barcodes)
+    columns: List[Tuple[int, str]] = [
+        (idx, key) for idx, key in enumerate(header) if key in useful_keys
+    ]
+    code_idx: int = header.index('code')
+    with open(path, 'rb') as csv_file:
+        csv_file.seek(start)
+        text: str = csv_file.read(end - start).decode('utf-8')
+    matched: List[Tuple[str, Dict[str, str]]] = []
+    for row in csv.reader(io.StringIO(text, newline=''), delimiter=separator):
+        if len(row) > code_idx and row[code_idx] in barcodes:
+            matched.append((row[code_idx], {
+                key: row[idx] if idx < len(row) else None
+                for idx, key in columns
+            }))
+    return matched
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+'''Sorted barcode -> byte offset index of the OFF CSV file, stored
+alongside the dump, so that the rows of given barcodes can be read
+w/o scanning the whole file.
+Index file format: a header (MAGIC, size and mtime of the indexed dump)
+followed by fixed-width records (barcode padded w/ NUL bytes, offset of
+the row) sorted by barcode'''
+from bisect import bisect_left
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+import csv
+import mmap
+import os
+import struct
+
+
+MAGIC: bytes = b'OFFIDX01'
+HEADER: struct.Struct = struct.Struct('<8sQQ')
+RECORD: struct.Struct = struct.Struct('<24sQ')
+KEY_SIZE: int = 24
+
+
+def index_path_for(csv_path: str) -> str:
+    '''Path of the index file of the CSV file'''
+    return f'{csv_path}.idx'
+
+
+def _dump_stamp(csv_path: str) -> Tuple[int, int]:
+    stat: os.stat_result = os.stat(csv_path)
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+def build_index(csv_path: str, separator: str = '\t',
+                index_path: Optional[str] = None) -> int:
+    '''Index the rows of the CSV file by barcode (the barcodes longer
+    than KEY_SIZE bytes are left out). Return the number of rows indexed'''
+    sep: bytes = separator.encode('utf-8')
+    entries: List[Tuple[bytes, int]] = []
+    with open(csv_path, 'rb') as csv_file:
+        header: bytes = csv_file.readline()
+        code_idx: int = next(csv.reader(
+            [header.decode('utf-8').rstrip('\r\n')], delimiter=separator
+        )).index('code')
+        offset: int = len(header)
+        for line in csv_file:
+            fields: List[bytes] = line.split(sep, code_idx + 1)
+            if len(fields) > code_idx:
+                code: bytes = fields[code_idx].rstrip(b'\r\n')
+                if code and len(code) <= KEY_SIZE:
+                    entries.append((code, offset))
+            offset += len(line)
+    entries.sort()
+    with open(index_path or index_path_for(csv_path), 'wb') as index_file:
+        index_file.write(HEADER.pack(MAGIC, *_dump_stamp(csv_path)))
+        for code, offset in entries:
+            index_file.write(RECORD.pack(code, offset))
+    return len(entries)
+
+
+class _Keys:
+    '''Sequence view on the barcodes of the index records (for bisect)'''
+    def __init__(self, index: 'CsvIndex') -> None:
+        self.index: CsvIndex = index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __getitem__(self, position: int) -> bytes:
+        return self.index.record(position)[0]
+
+
+class CsvIndex:
+    '''Memory-mapped index file, usable as a context manager'''
+    def __init__(self, index_path: str) -> None:
+        with open(index_path, 'rb') as index_file:
+            self.map: mmap.mmap = mmap.mmap(index_file.fileno(), 0,
+                                            access=mmap.ACCESS_READ)
+        magic, self.dump_size, self.dump_mtime = HEADER.unpack_from(self.map)
+        if magic != MAGIC:
+            self.map.close()
+            raise ValueError(f'{index_path} is not an OFF CSV index')
+
+    def __enter__(self) -> 'CsvIndex':
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return (len(self.map) - HEADER.size) // RECORD.size
+
+    def close(self) -> None:
+        self.map.close()
+
+    def is_stale(self, csv_path: str) -> bool:
+        '''True if the CSV file changed since it was indexed'''
+        return _dump_stamp(csv_path) != (self.dump_size, self.dump_mtime)
+
+    def record(self, position: int) -> Tuple[bytes, int]:
+        code, offset = RECORD.unpack_from(
+            self.map, HEADER.size + position * RECORD.size
+        )
+        return (code.rstrip(b'\0'), offset)
+
+    def offsets(self, barcode: str) -> List[int]:
+        '''Offsets of the rows of the barcode (in the order of the file)'''
+        code: bytes = barcode.encode('utf-8')
+        if not code or len(code) > KEY_SIZE:
+            return []
+        position: int = bisect_left(_Keys(self), code)
+        offsets: List[int] = []
+        while position < len(self):
+            found, offset = self.record(position)
+            if found != code:
+                break
+            offsets.append(offset)
+            position += 1
+        return offsets
+
+
+def open_index(csv_path: str, separator: str = '\t') -> CsvIndex:
+    '''Open the index of the CSV file, (re)building it if it is missing
+    or out of date'''
+    index_path: str = index_path_for(csv_path)
+    if os.path.isfile(index_path):
+        index: CsvIndex = CsvIndex(index_path)
+        if not index.is_stale(csv_path):
+            return index
+        index.close()
+    build_index(csv_path, separator, index_path)
+    return CsvIndex(index_path)
+
+
+def read_rows(csv_path: str, offsets: Iterable[int],
+              separator: str = '\t') -> Iterator[List[str]]:
+    '''Read the rows starting at the offsets of the memory-mapped CSV file
+    (the offsets are visited in ascending order)'''
+    with open(csv_path, 'rb') as csv_file, \
+            mmap.mmap(csv_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        for offset in sorted(offsets):
+            end: int = data.find(b'\n', offset)
+            line: str = data[offset:end if end >= 0 else len(data)].decode(
+                'utf-8'
+            ).rstrip('\r')
+            yield next(csv.reader([line], delimiter=separator))
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+from typing import Any, Dict, List
+import json
+import os
+import time
+from django.core.management.base import (BaseCommand, CommandError,
+                                         CommandParser)
+from OpenFoodFacts.csv_chunks import read_header
+from OpenFoodFacts.csv_index import build_index, open_index, read_rows
+from OpenFoodFacts.update_db import FoodDbUpdater
+
+
+class Command(BaseCommand):
+    help: str = ('Builds the barcode index of the downloaded OpenFoodFacts '
+                 'CSV file, or looks barcodes up through it')
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--file', default=FoodDbUpdater().off_csv_file,
+                            help='OFF CSV file (default: the one downloaded'
+                                 ' by update_food_db)')
+        parser.add_argument('--separator', default='\t',
+                            help='Separator of the CSV file')
+        parser.add_argument('--lookup', action='append', default=[],
+                            metavar='BARCODE',
+                            help='Display the non-empty fields of the rows of'
+                                 ' the barcode (repeatable, the index is'
+                                 ' built if missing or out of date)')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        '''Main method of custom command'''
+        csv_path: str = options['file']
+        if not os.path.isfile(csv_path):
+            raise CommandError(f'{csv_path} not found')
+        if options['lookup']:
+            self._lookup(csv_path, options['separator'], options['lookup'])
+            return
+        start: float = time.perf_counter()
+        nb_rows: int = build_index(csv_path, options['separator'])
+        print(f'{nb_rows} rows indexed in '
+              f'{time.perf_counter() - start:.1f}s')
+
+    def _lookup(self, csv_path: str, separator: str,
+                barcodes: List[str]) -> None:
+        header, __ = read_header(csv_path, separator)
+        with open_index(csv_path, separator) as index:
+            for barcode in barcodes:
+                offsets: List[int] = index.offsets(barcode)
+                if not offsets:
+                    print(f'{barcode}: not found')
+                for row in read_rows(csv_path, offsets, separator):
+                    data: Dict[str, str] = {
+                        key: val for key, val in zip(header, row) if val
+                    }
+                    print(json.dumps(data, ensure_ascii=False, indent=2))
@@ -1,16 +1,29 @@
 #!/usr/bin/env python3
-from typing import Any, List
+from typing import Any, List, Union
+import queue
+import threading
 from django.core.management.base import (BaseCommand, CommandError,
                                          CommandParser)
+from django.db import transaction
 from django.db.utils import IntegrityError
-from OpenFoodFacts.api import API
+from OpenFoodFacts.api import API, Product as OffProduct
+from Food.images import cache_product_images
 from Food.models import Category, Product
 
 
+Page = Union[List[OffProduct], BaseException, None]
+
+
 class FoodDbFeeder:
-    def __init__(self, categories: List[str], nb_products: int) -> None:
+    '''Feed the Food DB w/ the products of the categories: a background
+    thread fetches the pages of the API up to prefetch pages ahead of the
+    DB writer (the caller's thread), so that the network and the database
+    overlap'''
+    def __init__(self, categories: List[str], nb_products: int,
+                 prefetch: int = 2) -> None:
         self.categories: List[str] = categories
         self.nb_products: int = nb_products
+        self.prefetch: int = prefetch
         self.api: API = API()
 
     def run(self) -> None:
@@ -22,23 +35,89 @@ class FoodDbFeeder:
 
     def collect_products(self, category: Category) -> None:
         print(f'Collecting {self.nb_products} products for "{category.name}"')
-        page: int = 1
-        while len(category.products.all()) < self.nb_products:
-            self._collect_products(category, page)
-            page += 1
+        nb_collected: int = category.products.count()
+        self._nb_rejected: int = 0  # Products already in the DB
+        pages: queue.Queue = queue.Queue(maxsize=self.prefetch)
+        stop: threading.Event = threading.Event()
+        fetcher: threading.Thread = threading.Thread(
+            target=self._fetch_pages, args=(category.name, pages, stop),
+            daemon=True
+        )
+        fetcher.start()
+        try:
+            while nb_collected < self.nb_products:
+                products: Page = pages.get()
+                if products is None:  # No more products in the API
+                    break
+                if isinstance(products, BaseException):
+                    raise products
+                nb_collected += self._save_products(
+                    category, products, self.nb_products - nb_collected
+                )
+        finally:
+            stop.set()
+            fetcher.join()
         print('\n')
 
-    def _collect_products(self, category: Category, page: int) -> None:
-        for product in self.api.search(category.name, page, self.nb_products):
-            if len(category.products.all()) >= self.nb_products:
+    def _fetch_pages(self, category_name: str, pages: queue.Queue,
+                     stop: threading.Event) -> None:
+        '''Fetch the pages of the category (in the background thread) until
+        stopped or the API runs out of products, the errors being handed
+        over to the writer. The size of the pages is adapted to the
+        number of products still expected (the fetcher waiting while
+        enough products are fetched, unless some are rejected)'''
+        offset: int = 0
+        nb_fetched: int = 0
+        last: Page = None
+        try:
+            while not stop.is_set():
+                nb_missing: int = (self.nb_products - nb_fetched
+                                   + self._nb_rejected)
+                if nb_missing <= 0:
+                    stop.wait(.05)
+                    continue
+                products, nb_received = self.api.search_from(
+                    category_name, offset, nb_missing
+                )
+                if not nb_received:
+                    break
+                offset += nb_received
+                nb_fetched += len(products)
+                if products:
+                    self._put(pages, products, stop)
+        except BaseException as e:
+            last = e
+        self._put(pages, last, stop)
+
+    def _put(self, pages: queue.Queue, page: Page,
+             stop: threading.Event) -> None:
+        '''Wait for room in the queue, unless the writer is done'''
+        while not stop.is_set():
+            try:
+                pages.put(page, timeout=.1)
+                return
+            except queue.Full:
+                pass
+
+    def _save_products(self, category: Category, products: List[OffProduct],
+                       nb_missing: int) -> int:
+        '''Save up to nb_missing products in the category and return the
+        number of products saved'''
+        nb_saved: int = 0
+        for product in products:
+            if nb_saved >= nb_missing:
                 break
             try:
-                category.products.add(
-                    Product.objects.create(**product.to_food_db)
-                )
+                with transaction.atomic():  # Savepoint, if in a transaction
+                    new_product: Product = Product.objects.create(
+                        **product.to_food_db
+                    )
+                category.products.add(new_product)
+                nb_saved += 1
                 print('.', end='')
             except IntegrityError:
-                pass
+                self._nb_rejected += 1
+        return nb_saved
 
 
 class Command(BaseCommand):
@@ -55,6 +134,14 @@ class Command(BaseCommand):
             type=int, dest='nb_products', default=20,
             help='Number of the expected products by category'
         )
+        parser.add_argument(
+            '--prefetch', type=int, default=2,
+            help='Number of pages fetched ahead of the DB inserts'
+        )
+        parser.add_argument(
+            '--cache-images', action='store_true',
+            help='Download the images of the products to the local cache'
+        )
 
     def handle(self, *args: Any, **options: Any) -> None:
         if not options['categories']:
@@ -62,6 +149,9 @@ class Command(BaseCommand):
         if not options['nb_products']:
             options['nb_products'] = 0
         food_db_feeder: FoodDbFeeder = FoodDbFeeder(
-            options['categories'], options['nb_products']
+            options['categories'], options['nb_products'],
+            max(options['prefetch'], 1)
         )
         food_db_feeder.run()
+        if options['cache_images']:
+            cache_product_images()
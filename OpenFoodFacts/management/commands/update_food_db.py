@@ -2,7 +2,8 @@
 from datetime import datetime
 from typing import Any
 import os
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandParser
+from Food.images import cache_product_images
 from OpenFoodFacts.update_db import FoodDbUpdater
 
 
@@ -10,11 +11,30 @@ class Command(BaseCommand):
     help: str = ('Collects new data from the OpenFoodFacts API '
                  'to update the Food DB records')
 
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Number of processes parsing the CSV file'
+                                 ' (0: one by CPU core)')
+        parser.add_argument('--use-index', action='store_true',
+                            help='Read the rows of the known products only,'
+                                 ' through the barcode index of the CSV file')
+        parser.add_argument('--skip-download', action='store_true',
+                            help='Reuse the previously downloaded CSV file')
+        parser.add_argument('--cache-images', action='store_true',
+                            help='Download the images of the products to'
+                                 ' the local image cache')
+
     def handle(self, *args: Any, **options: Any) -> None:
         '''Main method of custom command'''
         self._display_info(datetime.now(), action='start')
-        food_db_updater: FoodDbUpdater = FoodDbUpdater()
+        food_db_updater: FoodDbUpdater = FoodDbUpdater(
+            workers=options['workers'] or os.cpu_count() or 1,
+            use_index=options['use_index'],
+            download=not options['skip_download']
+        )
         food_db_updater.run()
+        if options['cache_images']:
+            cache_product_images()
         self._display_info(datetime.now(), action='end')
 
     def _display_info(self, time: datetime, action: str) -> None:
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+'''Synthetic OpenFoodFacts data (CSV dumps and API pages) and a local mock
+server serving them, used to benchmark and test the import pipelines
+without the network'''
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from urllib.parse import parse_qs, urlparse
+import json
+import os
+import random
+import shutil
+import threading
+import zlib
+
+
+WORDS: Sequence[str] = (
+    'chips', 'glace', 'pizza', 'chocolat', 'vanille', 'fraise', 'nature',
+    'sel', 'poivre', 'fromage', 'jambon', 'noisette', 'caramel', 'citron',
+    'crème', 'lait', 'noir', 'blanc', 'bio', 'extra', 'fin', 'tomate',
+)
+CSV_COLUMNS: Sequence[str] = (
+    'code', 'url', 'creator', 'created_t', 'created_datetime',
+    'last_modified_t', 'last_modified_datetime', 'product_name',
+    'generic_name', 'quantity', 'packaging', 'brands', 'categories',
+    'categories_tags', 'countries', 'ingredients_text', 'allergens',
+    'nutrition_grade_fr', 'nova_group', 'main_category', 'image_url',
+    'image_small_url', 'energy_100g', 'fat_100g', 'saturated-fat_100g',
+    'sugars_100g', 'salt_100g',
+)
+IMAGES_URL: str = 'https://static.openfoodfacts.org/images'
+
+
+def _product_name(rand: random.Random) -> str:
+    return ' '.join(rand.sample(WORDS, 3)).capitalize()
+
+
+def csv_row(code: str, rand: random.Random, nb_columns: int) -> List[str]:
+    '''Synthetic row of the OFF CSV dump (nb_columns values)'''
+    values: Dict[str, str] = {
+        'code': code,
+        'url': f'https://fr.openfoodfacts.org/produit/{code}',
+        'creator': 'openfoodfacts-contributors',
+        'created_t': str(rand.randint(1300000000, 1560000000)),
+        'product_name': _product_name(rand),
+        'quantity': f'{rand.randint(1, 20) * 50} g',
+        'brands': rand.choice(WORDS).capitalize(),
+        'categories': 'Snacks,Chips',
+        'countries': 'France',
+        'ingredients_text': ', '.join(rand.sample(WORDS, 8)),
+        'nutrition_grade_fr': rand.choice('abcde'),
+        'image_url': f'{IMAGES_URL}/{code}.400.jpg',
+        'energy_100g': str(rand.randint(50, 2500)),
+        'salt_100g': f'{rand.random():.2f}',
+    }
+    row: List[str] = [values.get(column, '') for column in CSV_COLUMNS]
+    row.extend(f'{rand.random():.3f}'
+               for __ in range(nb_columns - len(CSV_COLUMNS)))
+    return row
+
+
+def write_csv_dump(
+    path: str, nb_rows: int, known_barcodes: Iterable[str] = (),
+    seed: int = 0, separator: str = '\t', nb_columns: int = 160
+) -> int:
+    '''Write a synthetic OFF CSV dump of nb_rows rows, including the known
+    barcodes at random positions. Return the number of bytes written'''
+    rand: random.Random = random.Random(seed)
+    known: List[str] = list(known_barcodes)[:nb_rows]
+    positions: Dict[int, str] = dict(zip(
+        rand.sample(range(nb_rows), len(known)), known
+    ))
+    columns: List[str] = list(CSV_COLUMNS) + [
+        f'extra_{i}' for i in range(nb_columns - len(CSV_COLUMNS))
+    ]
+    with open(path, 'w') as dump:
+        dump.write(separator.join(columns) + '\n')
+        for i in range(nb_rows):
+            code: str = positions.get(i, str(2000000000000 + i))
+            dump.write(separator.join(csv_row(code, rand, nb_columns)) + '\n')
+        return dump.tell()
+
+
+def api_product(category: str, offset: int, completeness: float) -> Dict:
+    '''Synthetic product of the OFF API (search results), the same for
+    a given category and offset whatever the page size'''
+    rand: random.Random = random.Random(f'{category}:{offset}')
+    code: str = str(1000000000000 + zlib.crc32(category.encode('utf-8'))
+                    % 1000 * 10 ** 7 + offset)
+    product: Dict[str, Any] = {
+        'id': code,
+        'code': code,
+        'product_name': _product_name(rand),
+        'nutrition_grades': rand.choice('abcde'),
+        'url': f'https://fr.openfoodfacts.org/produit/{code}',
+        'image_url': f'{IMAGES_URL}/{code}.400.jpg',
+        'image_nutrition_small_url': f'{IMAGES_URL}/{code}.n.200.jpg',
+        'brands': rand.choice(WORDS).capitalize(),
+        'categories': category,
+        'quantity': f'{rand.randint(1, 20) * 50} g',
+        'ingredients_text': ', '.join(rand.sample(WORDS, 8)),
+        'image_small_url': f'{IMAGES_URL}/{code}.200.jpg',
+        'nova_group': rand.randint(1, 4),
+    }
+    if rand.random() > completeness:  # Incomplete product
+        product[rand.choice(('nutrition_grades', 'image_url',
+                             'image_nutrition_small_url'))] = ''
+    return product
+
+
+def api_page(
+    category: str, page: int, page_size: int, count: int = 10000,
+    completeness: float = .8, fields: Optional[Sequence[str]] = None
+) -> Dict[str, Any]:
+    '''Synthetic response of the OFF search API'''
+    first: int = (page - 1) * page_size
+    products: List[Dict[str, Any]] = [
+        api_product(category, offset, completeness)
+        for offset in range(first, min(first + page_size, count))
+    ]
+    if fields:
+        products = [{k: v for k, v in p.items() if k in fields}
+                    for p in products]
+    return {'count': count, 'page': page, 'page_size': page_size,
+            'skip': first, 'products': products}
+
+
+@dataclass
+class MockOffServer:
+    '''Local HTTP server mimicking OpenFoodFacts: serves the files of
+    root_dir under /data/ and synthetic pages on /cgi/search.pl.
+    Usable as a context manager (started on a free port)'''
+    root_dir: str
+    count: int = 10000
+    completeness: float = .8
+    requests: List[str] = field(default_factory=list)
+
+    def __enter__(self) -> 'MockOffServer':
+        self.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def url(self, path: str) -> str:
+        return self.base_url + path
+
+    def start(self) -> None:
+        mock: MockOffServer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                mock.requests.append(self.path)
+                url = urlparse(self.path)
+                if url.path == '/cgi/search.pl':
+                    self._send_search(parse_qs(url.query))
+                elif url.path.startswith('/data/'):
+                    self._send_file(os.path.join(
+                        mock.root_dir, os.path.basename(url.path)
+                    ))
+                else:
+                    self.send_error(404)
+
+            def _send_search(self, query: Dict[str, List[str]]) -> None:
+                fields: Optional[List[str]] = None
+                if 'fields' in query:
+                    fields = query['fields'][0].split(',')
+                body: bytes = json.dumps(api_page(
+                    query.get('tag_0', [''])[0],
+                    int(query.get('page', ['1'])[0]),
+                    int(query.get('page_size', ['20'])[0]),
+                    mock.count, mock.completeness, fields
+                )).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_file(self, path: str) -> None:
+                if not os.path.isfile(path):
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Length',
+                                 str(os.path.getsize(path)))
+                self.end_headers()
+                with open(path, 'rb') as served_file:
+                    shutil.copyfileobj(served_file, self.wfile)
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        self.server: ThreadingHTTPServer = ThreadingHTTPServer(
+            ('127.0.0.1', 0), Handler
+        )
+        self.thread: threading.Thread = threading.Thread(
+            target=self.server.serve_forever, args=(.05,), daemon=True
+        )
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
@@ -1,6 +1,8 @@
-from typing import List, Sequence
+from typing import List, Sequence, Set
+import tempfile
 from django.test import TestCase
 from OpenFoodFacts.api import API, Product
+from OpenFoodFacts.synthetic import MockOffServer
 
 
 class TestAPI(TestCase):
@@ -18,3 +20,55 @@ class TestAPI(TestCase):
             self.assertIn(product.nutrition_grades.upper(), allowed_grades)
             self.assertIn(product.to_food_db['nutrition_grade'],
                           allowed_grades)
+
+
+class TestAPIPaging(TestCase):
+    def setUp(self) -> None:
+        self.api: API = API()
+
+    def test_fields_are_useful_fields(self) -> None:
+        fields: Set[str] = set(str(self.api.BASE_PARAMS['fields']).split(','))
+        self.assertEqual(fields - {'product_name'},
+                         self.api.USEFUL_FIELDS - {'name'})
+
+    def test_completeness(self) -> None:
+        self.assertEqual(1., self.api.completeness('chips'))
+        list(self.api._parse_products({'products': [
+            {'product_name': 'Chips', 'id': 1, 'nutrition_grades': 'a',
+             'url': 'u', 'image_url': 'i', 'image_nutrition_small_url': 'n'},
+            {'product_name': 'Chips', 'id': 2},
+        ]}, 'chips'))
+        self.assertEqual(.5, self.api.completeness('chips'))
+        self.assertEqual(1., self.api.completeness('glace'))
+
+    def test_page_size_for(self) -> None:
+        self.assertEqual(20, self.api.page_size_for('chips', 5))
+        self.assertEqual(110, self.api.page_size_for('chips', 100))
+        self.assertEqual(1000, self.api.page_size_for('chips', 5000))
+        self.api.completeness_stats['chips'] = [100, 50]
+        self.assertEqual(220, self.api.page_size_for('chips', 100))
+        # The page has to start at the offset
+        self.assertEqual(250, self.api.page_size_for('chips', 100, 1000))
+        self.assertEqual(110, self.api.page_size_for('chips', 100, 110))
+        self.assertEqual(97, self.api.page_size_for('chips', 100, 97))
+        for offset in (1, 50, 97, 220, 999, 1000, 4400):
+            size: int = self.api.page_size_for('chips', 100, offset)
+            self.assertEqual(0, offset % size)
+            self.assertLessEqual(size, self.api.MAX_PAGE_SIZE)
+
+    def test_search_from(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+                MockOffServer(tmp_dir, count=300, completeness=.5) as server:
+            self.api.BASE_URL = server.url('/cgi/search.pl')
+            expected: List[Product] = list(self.api.search('chips', 1, 300))
+            products: List[Product] = []
+            offset: int = 0
+            while True:
+                page, nb_received = self.api.search_from('chips', offset, 40)
+                if not nb_received:
+                    break
+                products.extend(page)
+                offset += nb_received
+            self.assertEqual(expected, products)
+            self.assertEqual(300, offset)
+            self.assertLess(self.api.completeness('chips'), .8)
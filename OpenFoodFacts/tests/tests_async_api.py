@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+from typing import Any, List
+import asyncio
+import tempfile
+import time
+from django.test import SimpleTestCase
+from OpenFoodFacts.api import API, Product as OffProduct
+from OpenFoodFacts.async_api import AsyncAPI, RateLimiter
+from OpenFoodFacts.synthetic import MockOffServer
+
+
+class TestAsyncAPI(SimpleTestCase):
+    def setUp(self) -> None:
+        self.tmp_dir: tempfile.TemporaryDirectory = \
+            tempfile.TemporaryDirectory()
+        self.server: MockOffServer = MockOffServer(self.tmp_dir.name,
+                                                   count=200)
+        self.server.start()
+        self.api: AsyncAPI = AsyncAPI(max_concurrency=3,
+                                      requests_per_minute=60000)
+        self.api.BASE_URL = self.server.url('/cgi/search.pl')
+        self.sync_api: API = API()
+        self.sync_api.BASE_URL = self.api.BASE_URL
+
+    def tearDown(self) -> None:
+        self.server.stop()
+        self.tmp_dir.cleanup()
+
+    def _sync_products(self, pages: int) -> List[OffProduct]:
+        return [product for page in range(1, pages + 1)
+                for product in self.sync_api.search('chips', page, 20)]
+
+    def test_search(self) -> None:
+        async def search() -> List[OffProduct]:
+            return [product async for product
+                    in self.api.search('chips', 2, 20)]
+        self.assertEqual(list(self.sync_api.search('chips', 2, 20)),
+                         asyncio.run(search()))
+
+    def test_collect(self) -> None:
+        products: List[OffProduct] = asyncio.run(
+            self.api.collect('chips', 50)
+        )
+        self.assertEqual(50, len(products))
+        self.assertEqual(self._sync_products(10)[:50], products)
+
+    def test_collect_stops_when_enough(self) -> None:
+        asyncio.run(self.api.collect('chips', 10))
+        # 10 complete products fit in 1 or 2 pages, the 3 pages already
+        # requested being cancelled if not sent yet
+        self.assertLessEqual(len(self.server.requests), 3)
+        requests: int = len(self.server.requests)
+        asyncio.run(self.api.collect('chips', 10))
+        self.assertEqual(2 * requests, len(self.server.requests))
+
+    def test_collect_all_pages(self) -> None:
+        products: List[OffProduct] = asyncio.run(
+            self.api.collect('chips', 1000)
+        )
+        self.assertEqual(self._sync_products(10), products)
+        self.assertEqual(20, len(self.server.requests))  # 10 pages x 2
+
+    def test_bounded_concurrency(self) -> None:
+        running: List[int] = [0]
+        peak: List[int] = [0]
+        request: Any = self.api._request
+
+        def slow_request(params: Any) -> Any:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+            time.sleep(.02)
+            running[0] -= 1
+            return request(params)
+
+        self.api._request = slow_request  # type: ignore
+        asyncio.run(self.api.collect('chips', 1000))
+        self.assertLessEqual(peak[0], 3)
+
+    def test_rate_limiter(self) -> None:
+        async def acquire(limiter: RateLimiter, times: int) -> float:
+            start: float = time.monotonic()
+            for __ in range(times):
+                await limiter.acquire()
+            return time.monotonic() - start
+        self.assertLess(asyncio.run(acquire(RateLimiter(10, burst=3), 3)),
+                        .05)
+        self.assertGreaterEqual(
+            asyncio.run(acquire(RateLimiter(50, burst=1), 6)), .09
+        )
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+from contextlib import redirect_stdout
+from typing import List
+import io
+import os
+import tempfile
+from django.core.management import call_command
+from django.test import TestCase
+from OpenFoodFacts.csv_index import (build_index, CsvIndex, index_path_for,
+                                     open_index, read_rows)
+from OpenFoodFacts.synthetic import write_csv_dump
+
+
+class TestCsvIndex(TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir: tempfile.TemporaryDirectory = \
+            tempfile.TemporaryDirectory()
+        self.dump: str = os.path.join(self.tmp_dir.name, 'dump.csv')
+        self.barcodes: List[str] = [str(5000000000000 + i) for i in range(10)]
+        write_csv_dump(self.dump, 200, self.barcodes, nb_columns=30)
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_build_index(self) -> None:
+        self.assertEqual(200, build_index(self.dump))
+        with CsvIndex(index_path_for(self.dump)) as index:
+            self.assertEqual(200, len(index))
+            codes: List[bytes] = [index.record(i)[0] for i in range(200)]
+            self.assertEqual(sorted(codes), codes)
+            self.assertFalse(index.is_stale(self.dump))
+
+    def test_offsets(self) -> None:
+        build_index(self.dump)
+        with CsvIndex(index_path_for(self.dump)) as index:
+            for barcode in self.barcodes:
+                offsets: List[int] = index.offsets(barcode)
+                self.assertEqual(1, len(offsets))
+                row: List[str] = next(read_rows(self.dump, offsets))
+                self.assertEqual(barcode, row[0])
+                self.assertEqual(30, len(row))
+            self.assertEqual([], index.offsets('42'))
+            self.assertEqual([], index.offsets(''))
+            self.assertEqual([], index.offsets('9' * 30))
+
+    def test_duplicate_barcodes(self) -> None:
+        with open(self.dump, 'a') as dump:
+            dump.write('\t'.join([self.barcodes[0], 'dup']) + '\n')
+        build_index(self.dump)
+        with CsvIndex(index_path_for(self.dump)) as index:
+            offsets: List[int] = index.offsets(self.barcodes[0])
+        self.assertEqual(2, len(offsets))
+        self.assertEqual(offsets, sorted(offsets))
+        self.assertEqual('dup', list(read_rows(self.dump, offsets))[1][1])
+
+    def test_open_index_rebuilds_stale_index(self) -> None:
+        with open_index(self.dump) as index:
+            self.assertEqual(200, len(index))
+        write_csv_dump(self.dump, 50, self.barcodes, nb_columns=30)
+        with open_index(self.dump) as index:
+            self.assertEqual(50, len(index))
+            self.assertFalse(index.is_stale(self.dump))
+
+    def test_not_an_index(self) -> None:
+        with self.assertRaises(ValueError):
+            CsvIndex(self.dump)
+
+    def test_command(self) -> None:
+        out: io.StringIO = io.StringIO()
+        with redirect_stdout(out):
+            call_command('index_off_csv', file=self.dump)
+            call_command('index_off_csv', file=self.dump,
+                         lookup=[self.barcodes[0], '42'])
+        self.assertIn('200 rows indexed', out.getvalue())
+        self.assertIn(f'"code": "{self.barcodes[0]}"', out.getvalue())
+        self.assertIn('42: not found', out.getvalue())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+from contextlib import redirect_stdout
+from typing import Any, List, Tuple
+import io
+import tempfile
+import threading
+import time
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from Food.models import Category, Product
+from OpenFoodFacts.api import Product as OffProduct
+from OpenFoodFacts.management.commands.init_food_db import FoodDbFeeder
+from OpenFoodFacts.synthetic import api_product, MockOffServer
+
+
+class TestFoodDbFeeder(TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir: tempfile.TemporaryDirectory = \
+            tempfile.TemporaryDirectory()
+        self.server: MockOffServer = MockOffServer(self.tmp_dir.name,
+                                                   count=100)
+        self.server.start()
+        self.feeder: FoodDbFeeder = FoodDbFeeder(['chips', 'glace'], 15)
+        self.feeder.api.BASE_URL = self.server.url('/cgi/search.pl')
+
+    def tearDown(self) -> None:
+        self.server.stop()
+        self.tmp_dir.cleanup()
+
+    def _run(self, feeder: FoodDbFeeder) -> None:
+        with redirect_stdout(io.StringIO()):
+            feeder.run()
+
+    def test_run(self) -> None:
+        self._run(self.feeder)
+        for name in ('chips', 'glace'):
+            self.assertEqual(
+                15, Category.objects.get(name=name).products.count()
+            )
+        self.assertEqual(30, Product.objects.count())
+
+    def test_same_products_whatever_the_prefetch(self) -> None:
+        self._run(self.feeder)
+        products: List[str] = list(
+            Product.objects.order_by('barcode').values_list('barcode',
+                                                            flat=True)
+        )
+        self.feeder.prefetch = 1
+        self._run(self.feeder)
+        self.assertEqual(products, list(
+            Product.objects.order_by('barcode').values_list('barcode',
+                                                            flat=True)
+        ))
+
+    def test_stops_when_the_api_runs_out(self) -> None:
+        self.feeder.nb_products = 1000
+        self._run(self.feeder)
+        self.assertLess(Product.objects.count(), 200)
+        self.assertGreater(Product.objects.count(), 100)
+
+    def test_fetches_ahead_of_the_writes(self) -> None:
+        fetched: List[int] = []
+        search_from: Any = self.feeder.api.search_from
+
+        def counted_search_from(*args: Any) -> Tuple[List[OffProduct], int]:
+            fetched.append(args[1])
+            return search_from(*args)
+
+        save: Any = self.feeder._save_products
+        pages_fetched_while_saving: List[int] = []
+
+        def slow_save(*args: Any) -> int:
+            time.sleep(.05)
+            pages_fetched_while_saving.append(len(fetched))
+            return save(*args)
+
+        self.feeder.api.search_from = counted_search_from  # type: ignore
+        self.feeder.api.MAX_PAGE_SIZE = 20
+        self.feeder._save_products = slow_save  # type: ignore
+        self.feeder.nb_products = 25
+        self.feeder.categories = ['chips']
+        self._run(self.feeder)
+        self.assertEqual(25, Product.objects.count())
+        # While the first page is saved, the next ones are already fetched
+        self.assertGreaterEqual(pages_fetched_while_saving[0], 2)
+
+    def test_api_errors_are_raised(self) -> None:
+        def failing_search_from(*args: Any) -> Tuple[List[OffProduct], int]:
+            raise ConnectionError('OFF is down')
+
+        self.feeder.api.search_from = failing_search_from  # type: ignore
+        nb_threads: int = threading.active_count()
+        with self.assertRaises(ConnectionError):
+            self._run(self.feeder)
+        self.assertEqual(nb_threads, threading.active_count())
+
+    def test_command(self) -> None:
+        with self.assertRaises(CommandError):
+            call_command('init_food_db')
+
+    def test_few_requests(self) -> None:
+        self._run(self.feeder)
+        # 1 page of about 15 / .8 products is enough by category (the
+        # page size being adapted to the completeness ratio)
+        self.assertLessEqual(len(self.server.requests), 4)
+        for request in self.server.requests:
+            self.assertIn('fields=id', request)
+
+    def test_rejected_products_are_replaced(self) -> None:
+        for offset in range(3):
+            data: Any = api_product('chips', offset, 1.)
+            Product.objects.create(barcode=data['code'], name='Already',
+                                   nutrition_grade='A', url=data['url'])
+        category: Category = Category.objects.create(name='chips')
+        with redirect_stdout(io.StringIO()):
+            self.feeder.collect_products(category)
+        self.assertEqual(15, category.products.count())
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+from typing import Any, Dict, List
+import csv
+import os
+import tempfile
+from django.test import TestCase
+from Food.models import Product
+from OpenFoodFacts.api import API, Product as OffProduct
+from OpenFoodFacts.synthetic import api_page, MockOffServer, write_csv_dump
+from OpenFoodFacts.update_db import FoodDbUpdater
+
+
+class TestSyntheticData(TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir: tempfile.TemporaryDirectory = \
+            tempfile.TemporaryDirectory()
+        self.dump: str = os.path.join(self.tmp_dir.name, 'dump.csv')
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_write_csv_dump(self) -> None:
+        write_csv_dump(self.dump, 50, ['123', '456'], nb_columns=40)
+        with open(self.dump) as dump:
+            rows: List[Dict[str, str]] = list(
+                csv.DictReader(dump, delimiter='\t')
+            )
+        self.assertEqual(len(rows), 50)
+        self.assertEqual(len(rows[0]), 40)
+        self.assertEqual({'123', '456'} & {row['code'] for row in rows},
+                         {'123', '456'})
+        self.assertIn(rows[0]['nutrition_grade_fr'], 'abcde')
+
+    def test_api_page_stable_across_page_sizes(self) -> None:
+        big_page: Dict[str, Any] = api_page('chips', 1, 20)
+        small_page: Dict[str, Any] = api_page('chips', 2, 10)
+        self.assertEqual(big_page['products'][10:],
+                         small_page['products'])
+
+    def test_api_page_fields(self) -> None:
+        page: Dict[str, Any] = api_page('chips', 1, 5,
+                                        fields=['code', 'url'])
+        self.assertEqual(set(page['products'][0]), {'code', 'url'})
+
+    def test_api_against_mock_server(self) -> None:
+        with MockOffServer(self.tmp_dir.name, completeness=.5) as server:
+            api: API = API()
+            api.BASE_URL = server.url('/cgi/search.pl')
+            products: List[OffProduct] = list(api.search('chips', 1, 20))
+        self.assertGreater(len(products), 0)
+        self.assertLess(len(products), 20)
+        for product in products:
+            self.assertIn(product.to_food_db['nutrition_grade'], 'ABCDE')
+
+    def test_update_db_against_mock_server(self) -> None:
+        Product.objects.create(barcode='123', name='Old name',
+                               nutrition_grade='E', url='http://old.org')
+        write_csv_dump(self.dump, 100, ['123'])
+        with MockOffServer(self.tmp_dir.name) as server:
+            FoodDbUpdater(off_csv_url=server.url('/data/dump.csv'),
+                          tmp_dir=self.tmp_dir.name).run()
+        product: Product = Product.objects.get(barcode='123')
+        self.assertNotEqual(product.name, 'Old name')
+        self.assertEqual(product.url,
+                         'https://fr.openfoodfacts.org/produit/123')
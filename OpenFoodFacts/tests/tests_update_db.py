@@ -4,9 +4,13 @@ from unittest import skip
 import os
 import tempfile
 from django.core.management import call_command
+from django.db import connection
 from django.test import override_settings, TestCase
+from django.test.utils import CaptureQueriesContext
 import responses  # type: ignore
 from Food.models import Product
+from OpenFoodFacts.csv_chunks import read_header, split_chunks
+from OpenFoodFacts.synthetic import write_csv_dump
 from OpenFoodFacts.update_db import CsvData, FoodDbUpdater
 import Food  # noqa
 import OpenFoodFacts  # noqa
@@ -111,3 +115,91 @@ class TestFoodDbUpdater(TestCase):
         self.assertNotEqual(old_img, updated_product.url)
         self.assertEqual(data.url, updated_product.url)
         self.assertEqual(data.image_url, updated_product.img)
+
+    def test_update_product_saves_once(self) -> None:
+        product: Product = Product.objects.filter(barcode='123')[0]
+        data: CsvData = CsvData(
+            '123', 'Product 1', 'A', 'www.new_url1.org', 'www.new_img1.com'
+        )
+        with self.assertNumQueries(1):
+            self.db_updater.update_product(product, data)
+
+
+class TestParallelParsing(TestCase):
+    def setUp(self) -> None:
+        for i in range(30):
+            Product.objects.create(barcode=str(4000000000000 + i),
+                                   name=f'Product {i}', nutrition_grade='C',
+                                   url=f'www.url{i}.org')
+        self.tmp_dir: tempfile.TemporaryDirectory = \
+            tempfile.TemporaryDirectory()
+        self.db_updater: FoodDbUpdater = FoodDbUpdater(
+            tmp_dir=self.tmp_dir.name, workers=2, chunk_size=4096
+        )
+        write_csv_dump(self.db_updater.off_csv_file, 300,
+                       [str(4000000000000 + i) for i in range(30)],
+                       nb_columns=40)
+        self.db_updater.get_products()
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_split_chunks(self) -> None:
+        header, start = read_header(self.db_updater.off_csv_file, '\t')
+        self.assertEqual('code', header[0])
+        chunks: List[Tuple[int, int]] = split_chunks(
+            self.db_updater.off_csv_file, start, 4096
+        )
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(start, chunks[0][0])
+        self.assertEqual(os.path.getsize(self.db_updater.off_csv_file),
+                         chunks[-1][1])
+        for (__, end), (next_start, __) in zip(chunks, chunks[1:]):
+            self.assertEqual(end, next_start)
+        with open(self.db_updater.off_csv_file, 'rb') as csv_file:
+            for __, end in chunks:
+                csv_file.seek(end - 1)
+                self.assertEqual(b'\n', csv_file.read(1))
+
+    def test_parallel_same_as_serial(self) -> None:
+        parallel: List[Tuple[Product, CsvData]] = list(
+            self.db_updater.get_products_data()
+        )
+        self.db_updater.workers = 1
+        serial: List[Tuple[Product, CsvData]] = list(
+            self.db_updater.get_products_data()
+        )
+        self.assertEqual(30, len(parallel))
+        self.assertEqual(serial, parallel)
+
+    def test_indexed_same_as_serial(self) -> None:
+        self.db_updater.workers = 1
+        serial: List[Tuple[Product, CsvData]] = list(
+            self.db_updater.get_products_data()
+        )
+        self.db_updater.use_index = True
+        indexed: List[Tuple[Product, CsvData]] = list(
+            self.db_updater.get_products_data()
+        )
+        self.assertEqual(30, len(indexed))
+        self.assertEqual(serial, indexed)
+        self.assertTrue(os.path.isfile(self.db_updater.off_csv_file + '.idx'))
+
+    def test_run_parallel(self) -> None:
+        self.db_updater.get_off_csv_file = lambda: None  # type: ignore
+        self.db_updater.run()
+        for product in Product.objects.all():
+            self.assertIn('openfoodfacts.org', product.url)
+            self.assertIn(product.nutrition_grade, 'ABCDE')
+
+    def test_run_by_batches(self) -> None:
+        self.db_updater.get_off_csv_file = lambda: None  # type: ignore
+        self.db_updater.batch_size = 7
+        with CaptureQueriesContext(connection) as queries:
+            self.db_updater.run()
+        self.assertEqual(30, Product.objects.filter(
+            url__contains='openfoodfacts.org'
+        ).count())
+        self.assertEqual(5, sum(  # ceil(30 / 7) transactions (savepoints)
+            query['sql'].startswith('SAVEPOINT') for query in queries
+        ))
@@ -1,11 +1,18 @@
 #!/usr/bin/env python3
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field, fields
-from typing import Any, Dict, Iterator, Set, Tuple
+from itertools import repeat, zip_longest
+from typing import Any, Dict, Iterator, List, Set, Tuple
 import csv
 import os
 import tempfile
+from django.db import transaction
 import requests
 from Food.models import Product
+from OpenFoodFacts.csv_chunks import (
+    init_worker, parse_chunk, read_header, split_chunks
+)
+from OpenFoodFacts.csv_index import open_index, read_rows
 
 
 @dataclass
@@ -23,11 +30,24 @@ class CsvData:
 
 @dataclass
 class FoodDbUpdater:
-    '''Main class used to update the food database'''
+    '''Main class used to update the food database.
+    With workers > 1, the OFF CSV file is parsed by chunks of about
+    chunk_size bytes in a pool of worker processes. With use_index, only
+    the rows of the known barcodes are read, through the barcode index
+    of the file (built if missing or out of date). With download set to
+    False, the previously downloaded file is reused. The matching rows are
+    collected before any write, then the products are updated by
+    transactions of batch_size products (one transaction over the whole
+    parse would hold the write lock of SQLite for its duration)'''
     off_csv_url: str = 'https://fr.openfoodfacts.org/data/fr.openfoodfacts.org.products.csv'  # noqa
     csv_separator: str = '\t'
     tmp_dir: str = tempfile.gettempdir()
     output_file: str = 'off.products.csv'
+    workers: int = 1
+    chunk_size: int = 16 * 2 ** 20
+    use_index: bool = False
+    download: bool = True
+    batch_size: int = 500
     products: Dict[str, Product] = field(default_factory=dict)
     matching_csv_db: Dict[str, str] = field(default_factory=lambda: {
         'code': 'barcode', 'product_name': 'name', 'image_url': 'img',
@@ -41,10 +61,17 @@ class FoodDbUpdater:
 
     def run(self) -> None:
         '''Main method'''
-        self.get_off_csv_file()
+        if self.download or not os.path.isfile(self.off_csv_file):
+            self.get_off_csv_file()
         self.get_products()
-        for (product, csv_data) in self.get_products_data():
-            self.update_product(product, csv_data)
+        updates: List[Tuple[Product, CsvData]] = list(
+            self.get_products_data()
+        )
+        for start in range(0, len(updates), self.batch_size):
+            with transaction.atomic():
+                for (product, csv_data) in \
+                        updates[start:start + self.batch_size]:
+                    self.update_product(product, csv_data)
 
     def get_off_csv_file(self) -> None:
         '''Download the OFF CSV file by chunks
@@ -69,6 +96,12 @@ class FoodDbUpdater:
     def get_products_data(self) -> Iterator[Tuple[Product, CsvData]]:
         '''Generator iterating on the OFF CSV File and matching the
         useful metadata CsvData and Product objects for updates'''
+        if self.use_index:
+            yield from self._get_products_data_indexed()
+            return
+        if self.workers > 1:
+            yield from self._get_products_data_parallel()
+            return
         with open(self.off_csv_file) as off_file:
             off_data: Any = csv.DictReader(
                 off_file, delimiter=self.csv_separator
@@ -79,6 +112,43 @@ class FoodDbUpdater:
                     yield (self.products[barcode],
                            CsvData(**self._extract_useful_data(raw_data)))
 
+    def _get_products_data_parallel(
+        self
+    ) -> Iterator[Tuple[Product, CsvData]]:
+        '''Same as get_products_data, the chunks of the file being parsed
+        by the worker processes, which only send back the data of the known
+        barcodes. The data is yielded in the order of the file to the caller
+        (the only one writing to the DB)'''
+        header, start = read_header(self.off_csv_file, self.csv_separator)
+        chunks: List[Tuple[int, int]] = split_chunks(
+            self.off_csv_file, start, self.chunk_size
+        )
+        useful_keys: Set[str] = {f.name for f in fields(CsvData)}
+        with ProcessPoolExecutor(self.workers, initializer=init_worker,
+                                 initargs=(set(self.products),)) as executor:
+            for matched in executor.map(
+                parse_chunk, repeat(self.off_csv_file),
+                (start for start, __ in chunks), (end for __, end in chunks),
+                repeat(self.csv_separator), repeat(header),
+                repeat(useful_keys)
+            ):
+                for barcode, data in matched:
+                    yield (self.products[barcode], CsvData(**data))
+
+    def _get_products_data_indexed(
+        self
+    ) -> Iterator[Tuple[Product, CsvData]]:
+        '''Same as get_products_data, seeking the rows of the known barcodes
+        through the index of the file instead of scanning it'''
+        header, __ = read_header(self.off_csv_file, self.csv_separator)
+        with open_index(self.off_csv_file, self.csv_separator) as index:
+            offsets: List[int] = [offset for barcode in self.products
+                                  for offset in index.offsets(barcode)]
+        for row in read_rows(self.off_csv_file, offsets, self.csv_separator):
+            raw_data: Dict[str, Any] = dict(zip_longest(header, row))
+            yield (self.products[raw_data['code']],
+                   CsvData(**self._extract_useful_data(raw_data)))
+
     def _extract_useful_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         '''Extract useful data from the raw data collected by DictReader'''
         useful_keys: Set[str] = {f.name for f in fields(CsvData)}
@@ -92,4 +162,4 @@ class FoodDbUpdater:
         '''Update the Product in the database w/ the new CsvData'''
         for csv_attr, db_attr in self.matching_csv_db.items():
             setattr(product, db_attr, getattr(data, csv_attr))
-            product.save()
+        product.save()
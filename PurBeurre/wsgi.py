@@ -11,6 +11,10 @@ import os
 
 from django.core.wsgi import get_wsgi_application
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'PurBeurre.settings')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
 
 application = get_wsgi_application()
+
+# Load the catalogue (in-memory engines) or the fuzzy index at worker start
+from Food.engines import warm_up_engine  # noqa
+warm_up_engine()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+'''Latency benchmark of the web paths, driven through the test client
+against a synthetic catalogue'''
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+import math
+import random
+import statistics
+import time
+from django.db import connection
+from django.http import HttpResponse
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from Favorite.models import Favorite
+from Food.engines import bump_catalogue_version
+from Food.models import Category, Product
+from Food.text import normalize
+from User.models import User
+
+
+WORDS: Sequence[str] = (
+    'chips', 'glace', 'pizza', 'chocolat', 'vanille', 'fraise', 'nature',
+    'sel', 'poivre', 'fromage', 'jambon', 'noisette', 'caramel', 'citron',
+    'crème', 'lait', 'noir', 'blanc', 'bio', 'extra', 'fin', 'croustillant',
+    'paprika', 'tomate', 'mozzarella', 'pistache', 'coco', 'menthe',
+)
+CATEGORIES: Sequence[str] = ('chips', 'glace', 'pizza', 'chocolat')
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    '''Nearest-rank percentile of the values'''
+    ordered: List[float] = sorted(values)
+    rank: int = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def seed_catalogue(nb_products: int, seed: int = 0,
+                   categories: Sequence[str] = CATEGORIES) -> None:
+    '''Replace the Food DB with nb_products synthetic products spread
+    over the categories (bulk inserts, so that 100k products stay fast)'''
+    rand: random.Random = random.Random(seed)
+    Favorite.objects.all().delete()
+    Category.delete_all()
+    Product.delete_all()
+    products: List[Product] = []
+    for i in range(nb_products):
+        name: str = ' '.join((categories[i % len(categories)],
+                              *rand.sample(WORDS, 3), str(i)))
+        products.append(Product(
+            barcode=str(3000000000000 + i), name=name,
+            search_name=normalize(name),
+            nutrition_grade=rand.choice('ABCDE'),
+            url=f'https://fr.openfoodfacts.org/produit/{i}',
+            img=f'https://static.openfoodfacts.org/images/{i}.full.jpg',
+        ))
+    Product.objects.bulk_create(products, batch_size=500)
+    links: List[Any] = []
+    Link: Any = Category.products.through  # type: ignore
+    for category_name in categories:
+        category: Category = Category.objects.create(name=category_name)
+        product_ids: Iterator[int] = Product.objects.filter(
+            name__startswith=f'{category_name} '
+        ).values_list('pk', flat=True).iterator()
+        links.extend(Link(category_id=category.pk, product_id=product_id)
+                     for product_id in product_ids)
+    Link.objects.bulk_create(links, batch_size=500)
+    bump_catalogue_version()
+
+
+@dataclass
+class ScenarioResult:
+    '''Measures of the requests sent for one scenario'''
+    name: str
+    timings: List[float] = field(default_factory=list, repr=False)
+    queries: List[int] = field(default_factory=list, repr=False)
+    errors: int = 0
+    elapsed: float = 0.
+
+    @property
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'requests': len(self.timings),
+            'errors': self.errors,
+            'mean_ms': round(statistics.mean(self.timings), 3),
+            'p50_ms': round(percentile(self.timings, 50), 3),
+            'p95_ms': round(percentile(self.timings, 95), 3),
+            'p99_ms': round(percentile(self.timings, 99), 3),
+            'throughput_rps': round(len(self.timings) / self.elapsed, 1),
+            'queries_per_request': round(statistics.mean(self.queries), 2),
+        }
+
+
+@dataclass
+class WebBenchmark:
+    '''Drive the web paths through the test client and measure them'''
+    nb_requests: int = 200
+    seed: int = 0
+    email: str = 'bench@purbeurre.fr'
+
+    def __post_init__(self) -> None:
+        self.rand: random.Random = random.Random(self.seed)
+        self.client: Client = Client()
+        self.user_client: Client = Client()
+        user: User = User.objects.filter(email=self.email).first() or \
+            User.objects.create_user(email=self.email, password='bench')
+        self.user_client.force_login(user)
+        self.products: List[Tuple[str, str]] = list(
+            Product.objects.values_list('barcode', 'name')
+        )
+        self.pairs: Iterator[Tuple[str, str]] = self._favorite_pairs()
+
+    def _favorite_pairs(self) -> Iterator[Tuple[str, str]]:
+        '''Distinct (substituted, substitute) barcodes (a favorite is
+        unique by user)'''
+        for substituted, __ in self.products:
+            for substitute, __ in self.products:
+                if substitute != substituted:
+                    yield (substituted, substitute)
+
+    def scenarios(self) -> Dict[str, Callable[[], HttpResponse]]:
+        return {
+            'food:search': self._search,
+            'food:ajax': self._ajax,
+            'food:product': self._product,
+            'favorite:save': self._save,
+            'favorite:list': self._list,
+        }
+
+    def _random_product(self) -> Tuple[str, str]:
+        return self.rand.choice(self.products)
+
+    def _search(self) -> HttpResponse:
+        return self.user_client.post(reverse('food:search'), {
+            'food_search': self._random_product()[1]
+        })
+
+    def _ajax(self) -> HttpResponse:
+        return self.client.get(reverse('food:ajax'), {
+            'term': self._random_product()[1][:self.rand.randint(2, 12)]
+        })
+
+    def _product(self) -> HttpResponse:
+        return self.user_client.get(reverse('food:product', args=[
+            self._random_product()[0], self._random_product()[0]
+        ]))
+
+    def _save(self) -> HttpResponse:
+        substituted, substitute = next(self.pairs)
+        return self.user_client.post(reverse('favorite:save'), {
+            'substituted': substituted, 'substitute': substitute
+        })
+
+    def _list(self) -> HttpResponse:
+        return self.user_client.get(reverse('favorite:list'))
+
+    def run_scenario(self, name: str) -> ScenarioResult:
+        request: Callable[[], HttpResponse] = self.scenarios()[name]
+        result: ScenarioResult = ScenarioResult(name)
+        request()  # Warm up (templates, engine...)
+        start: float = time.perf_counter()
+        for __ in range(self.nb_requests):
+            with CaptureQueriesContext(connection) as queries:
+                sent: float = time.perf_counter()
+                response: HttpResponse = request()
+                result.timings.append((time.perf_counter() - sent) * 1000)
+            result.queries.append(len(queries))
+            if response.status_code >= 400:
+                result.errors += 1
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    def run(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: self.run_scenario(name).summary for name in self.scenarios()
+        }
+
+
+def compare(
+    previous: Dict[str, Any], current: Dict[str, Any], metric: str = 'p95_ms'
+) -> Iterator[Tuple[str, str, float, float]]:
+    '''Yield (size, scenario, previous, current) values of the metric for
+    the runs found in both benchmark reports'''
+    for size, scenarios in current.get('runs', {}).items():
+        for name, summary in scenarios.items():
+            before: Any = previous.get('runs', {}).get(size, {}).get(name)
+            if before is not None:
+                yield (size, name, before[metric], summary[metric])
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+'''Stage-by-stage benchmark of the import pipelines (FoodDbUpdater and
+FoodDbFeeder) against synthetic OpenFoodFacts data served locally'''
+from contextlib import contextmanager, redirect_stdout
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+import csv
+import io
+import os
+import resource
+import tempfile
+import time
+from Food.models import Product
+from OpenFoodFacts.api import Product as OffProduct
+from OpenFoodFacts.management.commands.init_food_db import FoodDbFeeder
+from OpenFoodFacts.synthetic import MockOffServer, write_csv_dump
+from OpenFoodFacts.update_db import CsvData, FoodDbUpdater
+from Testing.benchmark import seed_catalogue
+
+
+def peak_rss_mb() -> float:
+    '''Peak resident set size of the process so far (in MB)'''
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+@dataclass
+class StageTimer:
+    '''Accumulate the time spent in named stages, along with the number of
+    rows processed and the peak RSS at the end of each stage'''
+    times: Dict[str, float] = field(default_factory=dict)
+    rows: Dict[str, int] = field(default_factory=dict)
+    rss: Dict[str, float] = field(default_factory=dict)
+
+    @contextmanager
+    def stage(self, name: str, rows: int = 0) -> Iterator[None]:
+        start: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.times[name] = (self.times.get(name, 0.)
+                                + time.perf_counter() - start)
+            self.rows[name] = self.rows.get(name, 0) + rows
+            self.rss[name] = peak_rss_mb()
+
+    @property
+    def report(self) -> Dict[str, Dict[str, float]]:
+        return {
+            name: {
+                'seconds': round(seconds, 3),
+                'rows': self.rows[name],
+                'rows_per_s': round(self.rows[name] / seconds, 1)
+                if seconds else 0.,
+                'peak_rss_mb': round(self.rss[name], 1),
+            } for name, seconds in self.times.items()
+        }
+
+
+def bench_updater(nb_rows: int, nb_known: int, seed: int = 0,
+                  **updater_options: Any) -> Dict[str, Any]:
+    '''Time the stages of FoodDbUpdater.run (download, load, match, write)
+    on a synthetic dump of nb_rows rows, nb_known of them matching products
+    of the Food DB. The "parse" stage is a bare csv.DictReader pass over
+    the dump, the reference the "match" stage (which parses the dump as
+    well) is to be compared with'''
+    timer: StageTimer = StageTimer()
+    seed_catalogue(nb_known, seed)
+    barcodes: List[str] = list(
+        Product.objects.values_list('barcode', flat=True)
+    )
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        dump_size: int = write_csv_dump(
+            os.path.join(tmp_dir, 'dump.csv'), nb_rows, barcodes, seed
+        )
+        with MockOffServer(tmp_dir) as server:
+            updater: FoodDbUpdater = FoodDbUpdater(
+                off_csv_url=server.url('/data/dump.csv'), tmp_dir=tmp_dir,
+                **updater_options
+            )
+            with timer.stage('download', nb_rows):
+                updater.get_off_csv_file()
+        with timer.stage('load', nb_known):
+            updater.get_products()
+        with timer.stage('parse', nb_rows):
+            with open(updater.off_csv_file) as off_file:
+                for __ in csv.DictReader(off_file,
+                                         delimiter=updater.csv_separator):
+                    pass
+        with timer.stage('match', nb_rows):
+            matched: List[Tuple[Product, CsvData]] = list(
+                updater.get_products_data()
+            )
+        with timer.stage('write', len(matched)):
+            for product, csv_data in matched:
+                updater.update_product(product, csv_data)
+    return {'rows': nb_rows, 'known': nb_known, 'matched': len(matched),
+            'dump_mb': round(dump_size / 2 ** 20, 1),
+            'stages': timer.report}
+
+
+def bench_feeder(categories: List[str], nb_products: int,
+                 completeness: float = .8,
+                 prefetch: int = 2) -> Dict[str, Any]:
+    '''Time FoodDbFeeder.run for the categories: "fetch" is the time spent
+    (by the fetcher thread) waiting for the products of the synthetic API,
+    "write" the time spent saving them. The fetches being done ahead of
+    the writes, "overlap" is the time both of them ran at once'''
+    timer: StageTimer = StageTimer()
+    nb_written: int = len(categories) * nb_products
+    with tempfile.TemporaryDirectory() as tmp_dir, \
+            MockOffServer(tmp_dir, completeness=completeness) as server:
+        feeder: FoodDbFeeder = FoodDbFeeder(categories, nb_products,
+                                            prefetch)
+        feeder.api.BASE_URL = server.url('/cgi/search.pl')
+        search_from: Callable[..., Tuple[List[OffProduct], int]] = \
+            feeder.api.search_from
+        save: Callable[..., int] = feeder._save_products
+
+        def timed_search_from(*args: Any) -> Tuple[List[OffProduct], int]:
+            with timer.stage('fetch'):
+                products, nb_received = search_from(*args)
+            timer.rows['fetch'] += len(products)
+            return (products, nb_received)
+
+        def timed_save(*args: Any) -> int:
+            with timer.stage('write'):
+                nb_saved: int = save(*args)
+            timer.rows['write'] += nb_saved
+            return nb_saved
+
+        feeder.api.search_from = timed_search_from  # type: ignore
+        feeder._save_products = timed_save  # type: ignore
+        with redirect_stdout(io.StringIO()):
+            with timer.stage('total', nb_written):
+                feeder.run()
+        requests: int = len(server.requests)
+    overlap: float = max(0., timer.times['fetch'] + timer.times['write']
+                         - timer.times['total'])
+    return {'categories': len(categories), 'products': nb_written,
+            'api_requests': requests, 'overlap_s': round(overlap, 3),
+            'completeness': {
+                category: round(feeder.api.completeness(category), 3)
+                for category in categories
+            },
+            'stages': timer.report}
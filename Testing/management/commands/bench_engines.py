@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+from typing import Any, List
+import random
+import statistics
+import time
+from django.core.management.base import (BaseCommand, CommandError,
+                                         CommandParser)
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.module_loading import import_string
+from Food.engines import SubstituteEngine
+from Food.models import Product
+
+
+class Command(BaseCommand):
+    help: str = ('Benchmark the substitute engines (product lookup + '
+                 'substitutes) against the current Food DB')
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--engine', action='append', default=[], dest='engines',
+            help='Dotted path of an engine to benchmark (default: all)'
+        )
+        parser.add_argument('--nb_searches', type=int, default=500,
+                            help='Number of searches by engine')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Seed used to pick the searched products')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        engines: List[str] = options['engines'] or [
+            'Food.engines.OrmEngine', 'Food.engines.MemoryEngine'
+        ]
+        names: List[str] = list(
+            Product.objects.values_list('name', flat=True)
+        )
+        if not names:
+            raise CommandError('The Food DB is empty (see init_food_db)')
+        random.seed(options['seed'])
+        searches: List[str] = random.choices(names, k=options['nb_searches'])
+        for path in engines:
+            self._bench(path, searches)
+
+    def _bench(self, path: str, searches: List[str]) -> None:
+        '''Time the lookups of the engine and count the queries sent'''
+        engine: SubstituteEngine = import_string(path)()
+        start: float = time.perf_counter()
+        engine.warm_up()
+        warm_up: float = time.perf_counter() - start
+        timings: List[float] = []
+        with CaptureQueriesContext(connection) as queries:
+            for name in searches:
+                start = time.perf_counter()
+                product = engine.find_product(name)
+                if product is not None:
+                    engine.get_substitutes_for(product)
+                timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        print(f'{path}')
+        print(f'  warm up : {warm_up * 1000:10.2f} ms')
+        print(f'  mean    : {statistics.mean(timings):10.3f} ms')
+        print(f'  p95     : {timings[int(len(timings) * .95)]:10.3f} ms')
+        print(f'  queries : {len(queries) / len(searches):10.2f} / search')
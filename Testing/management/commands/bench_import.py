@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+from typing import Any, Dict
+import json
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connection
+from Testing.import_benchmark import bench_feeder, bench_updater
+
+
+class Command(BaseCommand):
+    help: str = ('Benchmark update_food_db and init_food_db stage by stage '
+                 'on synthetic OpenFoodFacts data (in a throwaway test '
+                 'database, w/o network)')
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--rows', type=int, default=100000,
+                            help='Number of rows of the synthetic CSV dump')
+        parser.add_argument('--known', type=int, default=2000,
+                            help='Number of dump rows matching the Food DB')
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Number of processes parsing the dump')
+        parser.add_argument(
+            '--category', action='append', default=[], dest='categories',
+            help='Category to feed (repeatable, default: chips)'
+        )
+        parser.add_argument('--nb_products', type=int, default=500,
+                            help='Number of products fed by category')
+        parser.add_argument('--prefetch', type=int, default=2,
+                            help='Number of pages fetched ahead of the'
+                                 ' DB inserts')
+        parser.add_argument('--skip-update', action='store_true',
+                            help='Do not benchmark update_food_db')
+        parser.add_argument('--skip-init', action='store_true',
+                            help='Do not benchmark init_food_db')
+        parser.add_argument('--output', default=None,
+                            help='JSON file receiving the report')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        report: Dict[str, Any] = {}
+        old_name: str = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True
+        )
+        try:
+            if not options['skip_update']:
+                report['update_food_db'] = bench_updater(
+                    options['rows'], options['known'],
+                    workers=options['workers']
+                )
+                self._display('update_food_db', report['update_food_db'])
+            if not options['skip_init']:
+                report['init_food_db'] = bench_feeder(
+                    options['categories'] or ['chips'],
+                    options['nb_products'], prefetch=options['prefetch']
+                )
+                self._display('init_food_db', report['init_food_db'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+        if options['output']:
+            with open(options['output'], 'w') as report_file:
+                json.dump(report, report_file, indent=2)
+
+    def _display(self, title: str, result: Dict[str, Any]) -> None:
+        print(title, {k: v for k, v in result.items() if k != 'stages'})
+        print(f'  {"stage":<10}{"seconds":>10}{"rows/s":>12}{"peak MB":>10}')
+        for name, stage in result['stages'].items():
+            print(f'  {name:<10}{stage["seconds"]:>10.3f}'
+                  f'{stage["rows_per_s"]:>12.1f}{stage["peak_rss_mb"]:>10.1f}')
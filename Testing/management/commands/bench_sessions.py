@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+from typing import Any, Dict
+import json
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connection
+from Testing.sessions_benchmark import bench_sessions, SESSION_ENGINES
+
+
+class Command(BaseCommand):
+    help: str = ('Count the DB reads/writes by request of the session '
+                 'engines (in a throwaway test database)')
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--engine', action='append', default=[], dest='engines',
+            help='Session engine (repeatable, default: all of them)'
+        )
+        parser.add_argument('--requests', type=int, default=50,
+                            help='Number of requests by phase')
+        parser.add_argument('--output', default=None,
+                            help='JSON file receiving the report')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        old_name: str = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True
+        )
+        try:
+            report: Dict[str, Any] = bench_sessions(
+                options['engines'] or SESSION_ENGINES, options['requests']
+            )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+        for engine, phases in report.items():
+            print(engine)
+            print(f'  {"phase":<10}{"session reads":>15}'
+                  f'{"session writes":>16}{"DB writes":>11}')
+            for phase, counts in phases.items():
+                print(f'  {phase:<10}{counts["session_reads"]:>15.2f}'
+                      f'{counts["session_writes"]:>16.2f}'
+                      f'{counts["db_writes"]:>11.2f}')
+        if options['output']:
+            with open(options['output'], 'w') as report_file:
+                json.dump(report, report_file, indent=2)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+from datetime import datetime
+from typing import Any, Dict
+import json
+import os
+import subprocess
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connection
+from Testing.benchmark import compare, seed_catalogue, WebBenchmark
+
+
+class Command(BaseCommand):
+    help: str = ('Benchmark the latency of the web paths on synthetic '
+                 'catalogues (in a throwaway test database)')
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--size', action='append', type=int, default=[], dest='sizes',
+            help='Number of products of the synthetic catalogue '
+                 '(repeatable, default: 1000)'
+        )
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Number of requests by path')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Seed of the synthetic catalogue')
+        parser.add_argument(
+            '--output', default=None,
+            help='JSON report (default: benchmarks/<commit>.json)'
+        )
+        parser.add_argument('--compare', default=None,
+                            help='Previous JSON report to compare with')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        report: Dict[str, Any] = {
+            'commit': self._git_commit(),
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'engine': settings.FOOD_SUBSTITUTE_ENGINE,
+            'requests': options['requests'],
+            'runs': {},
+        }
+        old_name: str = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True
+        )
+        try:
+            for size in options['sizes'] or [1000]:
+                print(f'Seeding {size} products')
+                seed_catalogue(size, options['seed'])
+                benchmark: WebBenchmark = WebBenchmark(
+                    options['requests'], options['seed']
+                )
+                report['runs'][str(size)] = benchmark.run()
+                self._display(size, report['runs'][str(size)])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+        output: str = options['output'] or os.path.join(
+            'benchmarks', f'{report["commit"] or "results"}.json'
+        )
+        os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+        with open(output, 'w') as report_file:
+            json.dump(report, report_file, indent=2)
+        print(f'Report written in {output}')
+        if options['compare']:
+            with open(options['compare']) as previous_file:
+                previous: Dict[str, Any] = json.load(previous_file)
+            print(f'p95 compared with {options["compare"]}:')
+            for size, name, before, after in compare(previous, report):
+                print(f'{size:>7} {name:<15} {before:9.2f} -> {after:9.2f} ms'
+                      f' ({(after - before) / before:+.0%})')
+
+    def _display(self, size: int, results: Dict[str, Dict[str, Any]]) -> None:
+        print(f'{"path":<15}{"p50":>9}{"p95":>9}{"p99":>9}'
+              f'{"req/s":>9}{"queries":>9}')
+        for name, summary in results.items():
+            print(f'{name:<15}{summary["p50_ms"]:>9.2f}'
+                  f'{summary["p95_ms"]:>9.2f}{summary["p99_ms"]:>9.2f}'
+                  f'{summary["throughput_rps"]:>9.1f}'
+                  f'{summary["queries_per_request"]:>9.2f}')
+
+    def _git_commit(self) -> str:
+        '''Short hash of the benchmarked commit (empty if unavailable)'''
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+            ).stdout.decode('utf-8').strip()
+        except OSError:
+            return ''
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+'''Number of database reads and writes by request, of the session table
+and overall, for the session engines (login, browsing and logout of a user,
+anonymous visits)'''
+from typing import Any, Callable, Dict, List, Sequence
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.db import connection
+from django.http import HttpResponse
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from User.models import User
+
+
+SESSION_ENGINES: Sequence[str] = (
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cached_db',
+    'django.contrib.sessions.backends.cache',
+    'django.contrib.sessions.backends.signed_cookies',
+    'User.sessions',
+)
+WRITE_STATEMENTS: Sequence[str] = ('INSERT', 'UPDATE', 'DELETE')
+
+
+def count_queries(queries: List[Dict[str, str]]) -> Dict[str, int]:
+    '''Number of reads and writes of the session table, and of writes
+    to any table, among the captured queries'''
+    counts: Dict[str, int] = {'session_reads': 0, 'session_writes': 0,
+                              'db_writes': 0}
+    for query in queries:
+        sql: str = query['sql'].lstrip().upper()
+        write: bool = sql.startswith(WRITE_STATEMENTS)
+        counts['db_writes'] += write
+        if Session._meta.db_table.upper() in sql:
+            counts['session_writes' if write else 'session_reads'] += 1
+    return counts
+
+
+def bench_session_engine(engine: str, nb_requests: int = 50,
+                         email: str = 'bench-sessions@purbeurre.fr'
+                         ) -> Dict[str, Dict[str, float]]:
+    '''Average session reads/writes and DB writes by request of each phase
+    of a visit, w/ the session engine'''
+    password: str = 'bench-sessions'
+    if not User.objects.filter(email=email).exists():
+        User.objects.create_user(email=email, password=password)
+    caches['default'].clear()
+    client: Client = Client()
+    phases: Dict[str, Callable[[], HttpResponse]] = {
+        'anonymous': lambda: client.get('/'),
+        'login': lambda: client.post(reverse('user:login'), {
+            'email': email, 'password': password
+        }),
+        'browse': lambda: client.get(reverse('user:account')),
+        'logout': lambda: client.get(reverse('user:logout')),
+    }
+    nb_by_phase: Dict[str, int] = {'anonymous': nb_requests, 'login': 1,
+                                   'browse': nb_requests, 'logout': 1}
+    results: Dict[str, Dict[str, float]] = {}
+    with override_settings(SESSION_ENGINE=engine):
+        for phase, request in phases.items():
+            with CaptureQueriesContext(connection) as queries:
+                for __ in range(nb_by_phase[phase]):
+                    response: HttpResponse = request()
+                    if response.status_code >= 400:
+                        raise RuntimeError(f'{phase}: {response.status_code}')
+            results[phase] = {
+                name: round(nb / nb_by_phase[phase], 2)
+                for name, nb in count_queries(queries.captured_queries)
+                .items()
+            }
+    return results
+
+
+def bench_sessions(engines: Sequence[str] = SESSION_ENGINES,
+                   nb_requests: int = 50) -> Dict[str, Any]:
+    return {engine: bench_session_engine(engine, nb_requests)
+            for engine in engines}
@@ -1,3 +1,84 @@
+from typing import Any, Dict, List
 from django.test import TestCase
+from Food.engines import get_engine
+from Food.models import Category, Product
+from Testing.benchmark import (compare, percentile, seed_catalogue,
+                               WebBenchmark)
+from Testing.import_benchmark import bench_feeder, bench_updater
+from Testing.sessions_benchmark import bench_sessions, count_queries
 
-# Create your tests here.
+
+class TestBenchmark(TestCase):
+    def test_percentile(self) -> None:
+        values: List[float] = [float(i) for i in range(1, 101)]
+        self.assertEqual(percentile(values, 50), 50.)
+        self.assertEqual(percentile(values, 99), 99.)
+        self.assertEqual(percentile([3.], 95), 3.)
+
+    def test_seed_catalogue(self) -> None:
+        seed_catalogue(40)
+        self.assertEqual(Product.objects.count(), 40)
+        self.assertEqual(Category.objects.count(), 4)
+        product: Product = Product.objects.first()  # type: ignore
+        self.assertEqual(product.category_set.count(), 1)  # type: ignore
+        self.assertIsNotNone(get_engine().find_product(product.name))
+
+    def test_web_benchmark(self) -> None:
+        seed_catalogue(40)
+        results: Dict[str, Dict[str, Any]] = WebBenchmark(3).run()
+        self.assertEqual(set(results), {'food:search', 'food:ajax',
+                                        'food:product', 'favorite:save',
+                                        'favorite:list'})
+        for summary in results.values():
+            self.assertEqual(summary['requests'], 3)
+            self.assertEqual(summary['errors'], 0)
+            self.assertLessEqual(summary['p50_ms'], summary['p99_ms'])
+
+    def test_compare(self) -> None:
+        previous: Dict[str, Any] = {'runs': {'10': {'food:ajax': {
+            'p95_ms': 2.
+        }}}}
+        current: Dict[str, Any] = {'runs': {'10': {
+            'food:ajax': {'p95_ms': 3.}, 'food:search': {'p95_ms': 1.}
+        }}}
+        self.assertEqual(list(compare(previous, current)),
+                         [('10', 'food:ajax', 2., 3.)])
+
+
+class TestImportBenchmark(TestCase):
+    def test_bench_updater(self) -> None:
+        result: Dict[str, Any] = bench_updater(200, 20)
+        self.assertEqual(result['matched'], 20)
+        self.assertEqual(list(result['stages']),
+                         ['download', 'load', 'parse', 'match', 'write'])
+        self.assertEqual(result['stages']['write']['rows'], 20)
+
+    def test_bench_feeder(self) -> None:
+        result: Dict[str, Any] = bench_feeder(['chips', 'glace'], 10)
+        self.assertEqual(Product.objects.count(), 20)
+        self.assertGreater(result['api_requests'], 0)
+        self.assertIn('fetch', result['stages'])
+        self.assertIn('write', result['stages'])
+
+
+class TestSessionsBenchmark(TestCase):
+    def test_count_queries(self) -> None:
+        self.assertEqual(count_queries([
+            {'sql': 'SELECT "django_session"."session_data" FROM ...'},
+            {'sql': 'UPDATE "django_session" SET ...'},
+            {'sql': 'UPDATE "User_user" SET "last_login" = ...'},
+        ]), {'session_reads': 1, 'session_writes': 1, 'db_writes': 2})
+
+    def test_bench_sessions(self) -> None:
+        report: Dict[str, Any] = bench_sessions(
+            ['django.contrib.sessions.backends.db', 'User.sessions'], 3
+        )
+        self.assertEqual(list(report['User.sessions']),
+                         ['anonymous', 'login', 'browse', 'logout'])
+        self.assertEqual(
+            report['django.contrib.sessions.backends.db']['browse'][
+                'session_reads'], 1
+        )
+        self.assertEqual(
+            report['User.sessions']['browse']['session_reads'], 0
+        )
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class UserConfig(AppConfig):
     name = 'User'
+
+    def ready(self) -> None:
+        from User import signals  # noqa
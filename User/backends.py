@@ -0,0 +1,36 @@
+'''Authentication backend caching the users loaded by the
+AuthenticationMiddleware (once by authenticated request)'''
+from typing import Any, Optional
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from User.models import User
+
+
+def user_cache_key(user_id: Any) -> str:
+    return f'User:user:{user_id}'
+
+
+def forget_user(user_id: Any) -> None:
+    '''Drop the cached copy of the user (see User.signals)'''
+    cache.delete(user_cache_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    '''ModelBackend whose get_user keeps the users in the "default" cache
+    for settings.USER_CACHE_TIMEOUT seconds. The cached copy is dropped
+    whenever the user is saved or deleted, or its groups or permissions
+    change, so the cache must be shared by the workers (see settings).
+    The cached users include their password hash, which the session
+    check of every request needs (get_session_auth_hash): the shared cache
+    is a private service, trusted like the database, and holds a copy for
+    USER_CACHE_TIMEOUT seconds at most'''
+    def get_user(self, user_id: Any) -> Optional[User]:
+        key: str = user_cache_key(user_id)
+        user: Optional[User] = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)  # type: ignore
+            if user is not None:
+                cache.set(key, user, getattr(settings, 'USER_CACHE_TIMEOUT',
+                                             60))
+        return user
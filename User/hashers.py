@@ -0,0 +1,15 @@
+'''Password hasher whose cost is set by the settings (per environment).
+The hashes of another cost are upgraded at the next successful login'''
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    '''PBKDF2 (SHA256) w/ settings.PASSWORD_HASH_ITERATIONS iterations
+    (Django's default if unset). The algorithm is the one of Django's
+    hasher, so the existing hashes stay valid and get rehashed on login
+    (check_password) when their number of iterations differs'''
+    @property  # type: ignore
+    def iterations(self) -> int:  # type: ignore
+        return getattr(settings, 'PASSWORD_HASH_ITERATIONS', None) \
+            or PBKDF2PasswordHasher.iterations
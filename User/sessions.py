@@ -0,0 +1,62 @@
+'''Session engine keeping the sessions of anonymous visitors in the cache
+only, while the sessions of authenticated users are cached and written
+through to the database (so that they survive a cache flush).
+Enabled by settings.SESSION_ENGINE = 'User.sessions' '''
+from typing import Any, Dict, Optional, Set
+from django.contrib.auth import SESSION_KEY
+from django.contrib.sessions.backends.base import CreateError
+from django.contrib.sessions.backends.cached_db import (
+    SessionStore as CachedDbSessionStore
+)
+
+
+class SessionStore(CachedDbSessionStore):
+    def __init__(self, session_key: Optional[str] = None) -> None:
+        super().__init__(session_key)
+        self._keys_in_db: Set[str] = set()  # Keys having a row in the DB
+
+    def load(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = super().load()
+        if SESSION_KEY in data:  # Authenticated: written through
+            self._keys_in_db.add(self._get_or_create_session_key())
+        return data
+
+    def exists(self, session_key: Optional[str]) -> bool:
+        '''Only used to check that a new (random) key is free: looking it
+        up in the cache is enough'''
+        return self.cache_key_prefix + str(session_key) in self._cache
+
+    def save(self, must_create: bool = False) -> None:
+        if self.session_key is None:
+            return self.create()
+        if SESSION_KEY not in self._get_session(no_load=must_create):
+            return self._save_in_cache(must_create)
+        try:
+            super().save(must_create
+                         or self.session_key not in self._keys_in_db)
+        except CreateError:
+            if must_create:
+                raise
+            super().save()  # Row already in the DB after all
+        self._keys_in_db.add(self.session_key)
+
+    def _save_in_cache(self, must_create: bool) -> None:
+        '''Same as the "cache" session engine'''
+        data: Dict[str, Any] = self._get_session(no_load=must_create)
+        if must_create:
+            if not self._cache.add(self.cache_key, data,
+                                   self.get_expiry_age()):
+                raise CreateError
+        else:
+            self._cache.set(self.cache_key, data, self.get_expiry_age())
+
+    def delete(self, session_key: Optional[str] = None) -> None:
+        if session_key is None:
+            if self.session_key is None:
+                return
+            session_key = self.session_key
+        if session_key in self._keys_in_db:
+            super().delete(session_key)
+            self._keys_in_db.discard(session_key)
+        else:
+            self._cache.delete(self.cache_key_prefix + session_key)
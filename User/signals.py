@@ -0,0 +1,26 @@
+from typing import Any
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from User.backends import forget_user
+from User.models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender: Any, instance: User, **kwargs: Any) -> None:
+    forget_user(instance.pk)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def user_rights_changed(sender: Any, instance: Any, action: str,
+                        reverse: bool, pk_set: Any, **kwargs: Any) -> None:
+    if not reverse:
+        if action.startswith('post_'):
+            forget_user(instance.pk)
+    elif action == 'pre_clear':  # The users of the group/permission
+        for user_id in instance.user_set.values_list('pk', flat=True):
+            forget_user(user_id)
+    elif action.startswith('post_'):
+        for user_id in pk_set or ():
+            forget_user(user_id)
@@ -0,0 +1,77 @@
+from django.conf import settings
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import Client, override_settings, TestCase
+from User.backends import user_cache_key
+from User.models import User
+
+
+@override_settings(SESSION_ENGINE='User.sessions', AUTHENTICATION_BACKENDS=[
+    'User.backends.CachedModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+])
+class TestCachedModelBackend(TestCase):
+    URL: str = '/user/account'
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client: Client = Client()
+        self.user: User = User.objects.create_user(email='az@er.ty',
+                                                   password='azerty')
+        self.client.post('/user/login', {'email': 'az@er.ty',
+                                         'password': 'azerty'})
+
+    def get_user(self) -> User:
+        response: HttpResponse = self.client.get(self.URL)
+        return response.wsgi_request.user  # type: ignore
+
+    def test_user_cached(self) -> None:
+        self.assertEqual(self.get_user(), self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_user(), self.user)
+
+    def test_model_backend_sessions_kept(self) -> None:
+        self.assertIn('CachedModelBackend', self.client.session[
+            '_auth_user_backend'
+        ])
+        client: Client = Client()
+        client.force_login(self.user,
+                           'django.contrib.auth.backends.ModelBackend')
+        response: HttpResponse = client.get(self.URL)
+        self.assertEqual(response.wsgi_request.user, self.user)  # type: ignore
+
+    def test_save_invalidates(self) -> None:
+        self.get_user()
+        self.user.firstname = 'Jean'
+        self.user.save()
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
+        self.assertEqual(self.get_user().firstname, 'Jean')
+
+    def test_inactive_user_logged_out(self) -> None:
+        self.get_user()
+        self.user.is_active = False
+        self.user.save()
+        self.assertFalse(self.get_user().is_authenticated)
+
+    def test_password_change_logs_out(self) -> None:
+        self.get_user()
+        self.user.set_password('qwerty')
+        self.user.save()
+        self.assertFalse(self.get_user().is_authenticated)
+
+    def test_groups_change_invalidates(self) -> None:
+        group: Group = Group.objects.create(name='staff')
+        self.get_user()
+        self.user.groups.add(group)
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
+        self.get_user()
+        group.user_set.clear()  # type: ignore
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
+
+
+class TestAuthenticationBackends(TestCase):
+    def test_no_user_cache_without_shared_cache(self) -> None:
+        # The test settings use the default (per-process) LocMemCache
+        self.assertEqual(['django.contrib.auth.backends.ModelBackend'],
+                         settings.AUTHENTICATION_BACKENDS)
@@ -0,0 +1,38 @@
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.test import override_settings, TestCase
+from User.hashers import TunablePBKDF2PasswordHasher
+from User.models import User
+
+HASHERS = ['User.hashers.TunablePBKDF2PasswordHasher']
+
+
+@override_settings(PASSWORD_HASHERS=HASHERS)
+class TestTunablePBKDF2PasswordHasher(TestCase):
+    def iterations_of(self, user: User) -> int:
+        user.refresh_from_db()
+        return int(user.password.split('$')[1])
+
+    @override_settings(PASSWORD_HASH_ITERATIONS=0)
+    def test_default_iterations(self) -> None:
+        self.assertEqual(TunablePBKDF2PasswordHasher().iterations,
+                         PBKDF2PasswordHasher.iterations)
+
+    @override_settings(PASSWORD_HASH_ITERATIONS=1000)
+    def test_iterations_from_settings(self) -> None:
+        user: User = User.objects.create_user(email='az@er.ty',
+                                              password='azerty')
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$1000$'))
+        self.assertTrue(user.check_password('azerty'))
+
+    def test_rehash_on_login(self) -> None:
+        with self.settings(PASSWORD_HASH_ITERATIONS=1000):
+            user: User = User.objects.create_user(email='az@er.ty',
+                                                  password='azerty')
+        with self.settings(PASSWORD_HASH_ITERATIONS=2000):
+            self.assertIsNone(authenticate(username='az@er.ty',
+                                           password='wrong'))
+            self.assertEqual(self.iterations_of(user), 1000)
+            self.assertEqual(authenticate(username='az@er.ty',
+                                          password='azerty'), user)
+            self.assertEqual(self.iterations_of(user), 2000)
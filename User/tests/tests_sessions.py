@@ -0,0 +1,51 @@
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import Client, override_settings, TestCase
+from User.models import User
+from User.sessions import SessionStore
+
+
+@override_settings(SESSION_ENGINE='User.sessions')
+class TestSessionStore(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client: Client = Client()
+        self.password: str = 'azerty'
+        self.user: User = User.objects.create_user(
+            email='az@er.ty', password=self.password
+        )
+
+    def login(self) -> HttpResponse:
+        return self.client.post('/user/login', {
+            'email': self.user.email, 'password': self.password
+        })
+
+    def test_anonymous_session_not_in_db(self) -> None:
+        session: SessionStore = SessionStore()
+        session['search'] = 'nutella'
+        session.save()
+        self.assertFalse(Session.objects.exists())
+        self.assertEqual(SessionStore(session.session_key)['search'],
+                         'nutella')
+        session.delete()
+        self.assertFalse(SessionStore().exists(session.session_key))
+
+    def test_login_writes_through(self) -> None:
+        self.login()
+        self.assertEqual(Session.objects.count(), 1)
+        cache.clear()  # The session survives a cache flush
+        response: HttpResponse = self.client.get('/user/account')
+        self.assertEqual(response.status_code, 200)
+
+    def test_relogin_keeps_one_row(self) -> None:
+        self.login()
+        self.login()  # cycle_key: new key, the previous row is deleted
+        self.assertEqual(Session.objects.count(), 1)
+        self.assertEqual(Session.objects.get().session_key,
+                         self.client.cookies['sessionid'].value)
+
+    def test_logout_deletes_row(self) -> None:
+        self.login()
+        self.client.get('/user/logout')
+        self.assertFalse(Session.objects.exists())
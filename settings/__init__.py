@@ -1,5 +1,7 @@
 """
-Django settings for PurBeurre project.
+Django settings for PurBeurre project (production, default of manage.py and
+wsgi.py). The development and test settings extend them: settings.dev and
+settings.test, opted into w/ --settings or DJANGO_SETTINGS_MODULE.
 
 Generated by 'django-admin startproject' using Django 2.1.7.
 
@@ -11,7 +13,6 @@ https://docs.djangoproject.com/en/2.1/ref/settings/
 """
 
 import os
-import django_heroku
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -39,9 +40,8 @@ INSTALLED_APPS = [
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
-    'django.contrib.staticfiles',
+    'App.apps.StaticFilesConfig',
     'User.apps.UserConfig',
-    'Testing.apps.TestingConfig',
     'Food.apps.FoodConfig',
     'Favorite.apps.FavoriteConfig',
     'OpenFoodFacts',
@@ -50,6 +50,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'App.middleware.ReplicaStickinessMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -86,13 +88,111 @@ WSGI_APPLICATION = 'PurBeurre.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/2.1/ref/settings/#databases
 
+# The connections are kept CONN_MAX_AGE seconds (reused by the requests of a
+# worker). The SQLite connections wait up to SQLITE_BUSY_TIMEOUT seconds for
+# the lock of a writer, and are set up w/ SQLITE_PRAGMAS (see App.db): the
+# WAL journal lets the web workers read while update_food_db writes.
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': int(os.environ.get('CONN_MAX_AGE', 600)),
+        'OPTIONS': {
+            'timeout': float(os.environ.get('SQLITE_BUSY_TIMEOUT', 20)),
+        },
     }
 }
 
+SQLITE_PRAGMAS = {
+    'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'wal'),
+    # NORMAL is durable w/ WAL, except for the last commits on power loss
+    'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'normal'),
+    # Negative: in KiB (so 64 MiB of page cache by connection)
+    'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -65536)),
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 2 ** 20)),
+}
+
+# Read replica: when REPLICA_DATABASE_URL is set, the reads of the models of
+# REPLICA_APPS go to it (see App.routers), the writes staying on the primary.
+# The clients which wrote read from the primary for REPLICA_STICKY_SECONDS
+# (0: never). Locally, e.g. a copy of db.sqlite3 (made w/ the WAL journal in
+# it: sqlite3 db.sqlite3 ".backup replica.sqlite3") and
+# REPLICA_DATABASE_URL=sqlite:////path/to/replica.sqlite3
+
+REPLICA_APPS = ['Food']
+
+REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 5))
+
+if os.environ.get('REPLICA_DATABASE_URL'):
+    import dj_database_url
+    DATABASES['replica'] = {
+        **dj_database_url.parse(
+            os.environ['REPLICA_DATABASE_URL'],
+            conn_max_age=DATABASES['default']['CONN_MAX_AGE']
+        ),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['App.routers.ReplicaRouter']
+
+
+# Cache
+# https://docs.djangoproject.com/en/2.1/topics/cache/
+# The "default" cache holds the data shared by the workers (e.g. the catalogue
+# version) and should be a shared backend in production. The "templates" cache
+# holds the rendered fragments, keyed by content, so a local one is enough.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    },
+    'templates': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'templates',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+# Whether the "default" cache is shared by the workers (and the commands)
+shared_cache = not CACHES['default']['BACKEND'].endswith(
+    ('.LocMemCache', '.DummyCache')
+)
+
+
+# Sessions
+# https://docs.djangoproject.com/en/2.1/topics/http/sessions/
+# 'User.sessions' keeps the sessions of anonymous visitors in the cache only
+# and writes the sessions of authenticated users through to the database. It
+# is the default w/ a shared "default" cache (CACHE_BACKEND): a per-process
+# one would give each worker its own anonymous sessions, so the database
+# engine is the default otherwise. Another engine can be set, e.g.
+# 'django.contrib.sessions.backends.signed_cookies' (which needs no storage).
+
+SESSION_ENGINE = os.environ.get(
+    'SESSION_ENGINE',
+    'User.sessions' if shared_cache else 'django.contrib.sessions.backends.db'
+)
+
+
+# Password hashing
+# https://docs.djangoproject.com/en/2.1/topics/auth/passwords/
+# The cost of PBKDF2 (Django's default: 150000 iterations) can be lowered on
+# small dynos, where it dominates the CPU time of a login. The hashes of the
+# users are upgraded (or downgraded) to it at their next login.
+
+PASSWORD_HASH_ITERATIONS = int(os.environ.get('PASSWORD_HASH_ITERATIONS', 0))
+
+PASSWORD_HASHERS = [
+    'User.hashers.TunablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.1/ref/settings/#auth-password-validators
@@ -134,6 +234,16 @@ STATIC_URL = '/static/'
 
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
+# The static files are served by WhiteNoise. collectstatic fingerprints them
+# (their names hold a hash of their content, so that they are cached for good
+# by the browsers) and compresses them (gzip, and brotli if the Brotli package
+# is installed). The templates need the manifest written by collectstatic:
+# without it, use 'django.contrib.staticfiles.storage.StaticFilesStorage'.
+STATICFILES_STORAGE = os.environ.get(
+    'STATICFILES_STORAGE',
+    'whitenoise.storage.CompressedManifestStaticFilesStorage'
+)
+
 STATICFILES_DIRS = (
     os.path.join(BASE_DIR, 'App', 'static'),
     os.path.join(BASE_DIR, 'Favorite', 'static'),
@@ -144,6 +254,89 @@ AUTH_USER_MODEL = 'User.User'
 
 LOGIN_URL: str = '/user/login'
 
+# W/ a shared "default" cache, the users loaded by the AuthenticationMiddleware
+# are cached in it for USER_CACHE_TIMEOUT seconds, and dropped from it when
+# they change (a per-process cache would only drop the copy of the worker
+# which saved the user). ModelBackend stays listed for the sessions opened w/
+# it (the backend is stored in the session), which it keeps loading until the
+# next login.
+AUTHENTICATION_BACKENDS = [
+    'User.backends.CachedModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+] if shared_cache else ['django.contrib.auth.backends.ModelBackend']
+
+USER_CACHE_TIMEOUT: int = int(os.environ.get('USER_CACHE_TIMEOUT', 60))
+
+# Engine answering the product and substitute lookups of the Food views
+# ('Food.engines.OrmEngine', 'Food.engines.MemoryEngine' or
+# 'Food.engines.RankedEngine', which also ranks by name similarity).
+# The in-memory engines rebuild themselves when the catalogue version (stored
+# in the cache) changes: they need a shared cache backend (CACHE_BACKEND), to
+# see the imports, which run in their own process.
+FOOD_SUBSTITUTE_ENGINE: str = os.environ.get(
+    'FOOD_SUBSTITUTE_ENGINE', 'Food.engines.OrmEngine'
+)
+
+# Local cache of the product images (see Food.images), filled by the imports
+# (--cache-images) or by cache_food_images, and served by the Food app. Its
+# least recently served images are evicted over FOOD_IMAGE_CACHE_BYTES. Use a
+# persistent directory (the filesystem of a Heroku dyno is reset daily).
+FOOD_IMAGE_DIR: str = os.environ.get(
+    'FOOD_IMAGE_DIR', os.path.join(BASE_DIR, 'media', 'food')
+)
+
+FOOD_IMAGE_SIZES = (200, 400)
+
+FOOD_IMAGE_CACHE_BYTES: int = int(
+    os.environ.get('FOOD_IMAGE_CACHE_BYTES', 512 * 2 ** 20)
+)
+
 if os.environ.get('HEROKU'):
-    # Activate Django-Heroku.
-    django_heroku.settings(locals())
+    # Database of the add-on and logging to the console (what
+    # django_heroku.settings() did, w/o loading django_heroku and its test
+    # runner in the web workers)
+    import dj_database_url
+    if 'DATABASE_URL' in os.environ:
+        DATABASES['default'] = dj_database_url.config(
+            conn_max_age=DATABASES['default']['CONN_MAX_AGE'],
+            ssl_require=True
+        )
+        if 'CI' in os.environ:  # Heroku CI: the tests run on the add-on
+            DATABASES['default']['TEST'] = DATABASES['default']
+    LOGGING = {
+        'version': 1,
+        'disable_existing_loggers': False,
+        'formatters': {
+            'verbose': {
+                'format': ('%(asctime)s [%(process)d] [%(levelname)s] '
+                           'pathname=%(pathname)s lineno=%(lineno)s '
+                           'funcname=%(funcName)s %(message)s'),
+                'datefmt': '%Y-%m-%d %H:%M:%S'
+            },
+            'simple': {
+                'format': '%(levelname)s %(message)s'
+            }
+        },
+        'handlers': {
+            'null': {
+                'level': 'DEBUG',
+                'class': 'logging.NullHandler',
+            },
+            'console': {
+                'level': 'DEBUG',
+                'class': 'logging.StreamHandler',
+                'formatter': 'verbose'
+            }
+        },
+        'loggers': {
+            # The console handler of Django only logs w/ DEBUG on
+            'django': {
+                'handlers': ['console'],
+                'level': os.environ.get('DJANGO_LOG_LEVEL', 'INFO'),
+            },
+            'testlogger': {
+                'handlers': ['console'],
+                'level': 'INFO',
+            }
+        }
+    }
@@ -0,0 +1,8 @@
+'''Settings of the development environment: the production settings plus
+the dev-only apps (benchmarks, coverage)'''
+from settings import *  # noqa
+
+INSTALLED_APPS = INSTALLED_APPS + ['Testing.apps.TestingConfig']  # noqa: F405
+
+# No manifest to read (collectstatic isn't run in development)
+STATICFILES_STORAGE = 'django.contrib.staticfiles.storage.StaticFilesStorage'
@@ -0,0 +1,12 @@
+'''Settings of the test suite (manage.py test --settings=settings.test)'''
+import os
+from settings.dev import *  # noqa
+
+# Hashing at full cost only slows the tests down
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+    'User.hashers.TunablePBKDF2PasswordHasher',
+]
+
+if os.environ.get('HEROKU') and 'CI' in os.environ:  # Heroku CI
+    TEST_RUNNER = 'django_heroku.HerokuDiscoverRunner'